@@ -0,0 +1,230 @@
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
+
+
+class BarCollectionRenderer:
+    """Draw every bar as one `PolyCollection` backed by NumPy height and color arrays.
+
+    Each update only rewrites the vertices of the bars whose value changed and
+    the colors of the highlighted bars, so the per-frame cost depends on what
+    changed rather than on the array size.
+    """
+
+    def __init__(self, ax, arr, color="cyan", current_color="yellow", min_color="green", width=0.8):
+        """Add the bar collection for `arr` to `ax`."""
+        n = len(arr)
+        self.heights = np.asarray(arr, dtype=float)
+        left = np.arange(n) - width / 2
+        right = left + width
+
+        verts = np.zeros((n, 4, 2))
+        verts[:, 0, 0] = verts[:, 1, 0] = left
+        verts[:, 2, 0] = verts[:, 3, 0] = right
+        verts[:, 1, 1] = verts[:, 2, 1] = self.heights
+
+        self.palette = to_rgba_array([color, current_color, min_color])
+        self.colors = np.tile(self.palette[0], (n, 1))
+        self.collection = PolyCollection(verts, facecolors=self.colors, edgecolors="none")
+        ax.add_collection(self.collection)
+
+        self.paths = self.collection.get_paths()
+        self.highlighted = ()
+
+    def update(self, arr_data, current_index, min_index, changed=None):
+        """Apply a frame and return the artists that need redrawing.
+
+        `changed` lists the indices whose value may differ from the previous
+        frame; when it is None the new values are diffed against the old ones.
+        """
+        if changed is None:
+            changed = np.flatnonzero(self.heights != np.asarray(arr_data))
+
+        for i in changed:
+            height = arr_data[i]
+            self.heights[i] = height
+            self.paths[i].vertices[1:3, 1] = height  # Top edge of the bar
+
+        # Restoring the previous highlights before marking the new ones
+        for i in self.highlighted:
+            self.colors[i] = self.palette[0]
+
+        self.highlighted = [i for i in (min_index, current_index) if 0 <= i < len(self.heights)]
+
+        for i in self.highlighted:
+            self.colors[i] = self.palette[1] if i == current_index else self.palette[2]
+
+        self.collection.set_facecolor(self.colors)
+        self.collection.stale = True
+
+        return [self.collection]
+
+
+class BinnedRenderer:
+    """Level-of-detail view for arrays with more elements than the axes has pixel columns.
+
+    The array is split into one bin per pixel column, and each bin is drawn
+    as one vertical line of a single `LineCollection`: from its minimum to
+    its maximum (`mode='minmax'`) or from zero to its mean (`mode='mean'`).
+    Updates only recompute the bins holding changed positions, so the
+    per-frame cost depends on the screen width and on what changed, not on
+    the array size.
+    """
+
+    def __init__(self, ax, arr, color="cyan", current_color="yellow", min_color="green", mode="minmax", columns=None):
+        """Add the binned view of `arr` to `ax`, with one bin per pixel column unless `columns` is given."""
+        n = len(arr)
+        self.mode = mode
+        self.heights = np.asarray(arr, dtype=float).copy()
+        columns = min(n, columns or max(1, int(ax.get_window_extent().width)))
+        self.edges = np.linspace(0, n, columns + 1).astype(int)  # Bin c holds positions edges[c]:edges[c + 1]
+
+        segments = np.zeros((columns, 2, 2))
+        segments[:, :, 0] = ((self.edges[:-1] + self.edges[1:] - 1) / 2)[:, None]  # Centered on the bin
+
+        self.palette = to_rgba_array([color, current_color, min_color])
+        self.colors = np.tile(self.palette[0], (columns, 1))
+        # One pixel column per bin, so the lines are one pixel wide
+        linewidth = 72 / ax.figure.dpi * max(1.0, ax.get_window_extent().width / columns)
+        self.collection = LineCollection(segments, colors=self.colors, linewidths=linewidth, capstyle="projecting")
+        ax.add_collection(self.collection)
+
+        self.paths = self.collection.get_paths()
+        self.highlighted = ()
+        self.refresh(range(columns))
+
+    def bins_of(self, indices):
+        """Return the bins holding the given positions."""
+
+        return np.unique(np.searchsorted(self.edges, indices, side="right") - 1)
+
+    def refresh(self, bins):
+        """Recompute the line of every bin in `bins` from the stored heights."""
+        heights, edges = self.heights, self.edges
+
+        for c in bins:
+            values = heights[edges[c]:edges[c + 1]]
+
+            if self.mode == "mean":
+                self.paths[c].vertices[:, 1] = (0, values.mean())
+            else:
+                self.paths[c].vertices[:, 1] = (values.min(), values.max())
+
+    def update(self, arr_data, current_index, min_index, changed=None):
+        """Apply a frame and return the artists that need redrawing.
+
+        `changed` lists the positions whose value may differ from the previous
+        frame; when it is None every bin is recomputed.
+        """
+        if changed is None:
+            self.heights[:] = np.asarray(arr_data)
+            self.refresh(range(len(self.paths)))
+        elif len(changed):
+            changed = np.fromiter(changed, dtype=np.int64, count=len(changed))
+
+            for i in changed.tolist():
+                self.heights[i] = arr_data[i]
+
+            self.refresh(self.bins_of(changed))
+
+        # Restoring the previous highlights before marking the new ones
+        for c in self.highlighted:
+            self.colors[c] = self.palette[0]
+
+        self.highlighted = []
+
+        # Marking the current index last, so it wins when both share a bin
+        for i, shade in ((min_index, 2), (current_index, 1)):
+            if 0 <= i < len(self.heights):
+                c = np.searchsorted(self.edges, i, side="right") - 1
+                self.colors[c] = self.palette[shade]
+                self.highlighted.append(c)
+
+        self.collection.set_color(self.colors)
+        self.collection.stale = True
+
+        return [self.collection]
+
+
+def create_renderer(ax, arr, **kwargs):
+    """Draw `arr` as bars, or binned once there are more elements than pixel columns."""
+    if len(arr) > ax.get_window_extent().width:
+        return BinnedRenderer(ax, arr, **kwargs)
+
+    return BarCollectionRenderer(ax, arr, **kwargs)
+
+
+class EventMarkers:
+    """Mark the algorithm-level events of an `OperationTrace` during playback.
+
+    The bounds of the latest run or merge, and of every chunk handed out so
+    far, are drawn as vertical lines and the latest event is described in a
+    label, with the merge progress counted in frames since the merge began
+    (one per element written). Events are applied as playback reaches them,
+    and replayed from the start after a seek back.
+    """
+
+    def __init__(self, ax, color="black"):
+        """Add the boundary lines and the event label to `ax`."""
+        # x in data coordinates, y spanning the axes whatever the value range
+        self.lines = LineCollection([], colors=color, linewidths=1, linestyles="dashed", transform=ax.get_xaxis_transform())
+        ax.add_collection(self.lines, autolim=False)
+        self.label = ax.text(0.5, 0.98, "", transform=ax.transAxes, ha="center", va="top", color=color)
+        self.reset()
+
+    def reset(self):
+        """Forget every applied event, e.g. when a new trace starts."""
+        self.applied = 0
+        self.bounds = ()  # Positions delimiting the latest run or merge
+        self.chunks = set()  # Chunk bounds stay marked through the merge
+        self.latest = None
+        self.latest_frame = 0
+        self.lines.set_segments([])
+        self.label.set_text("")
+
+    def apply(self, kind, indices, frame):
+        """Take one event, preceding `frame`, into account."""
+        if kind == 'chunk':
+            self.chunks.update(indices)
+        elif len(indices) >= 2:
+            self.bounds = indices
+
+        self.latest = (kind, indices)
+        self.latest_frame = frame
+
+    def describe(self, frame):
+        """Return the label text for the latest event, as seen at `frame`."""
+        if self.latest is None:
+            return ""
+
+        kind, indices = self.latest
+
+        if kind == 'chunk':
+            return f"{len(self.chunks) - 1} chunks"
+
+        if len(indices) >= 2:
+            text = f"{kind} " + " + ".join(f"[{lo}, {hi})" for lo, hi in zip(indices, indices[1:]))
+
+            if kind == 'merge':
+                span = indices[-1] - indices[0]
+                text += f": {min(span, frame - self.latest_frame + 1):,}/{span:,}"
+
+            return text
+
+        return f"{kind} at " + ", ".join(map(str, indices))
+
+    def update(self, trace, frame):
+        """Show the events of `trace` up to `frame` and return the artists that need redrawing."""
+        count = trace.events_until(frame)
+
+        if count < self.applied:
+            self.reset()  # Seeking back
+
+        for k in range(self.applied, count):
+            self.apply(*trace.events[k], trace.event_frames[k])
+
+        self.applied = count
+        self.lines.set_segments([[(b - 0.5, 0), (b - 0.5, 1)] for b in self.chunks.union(self.bounds)])
+        self.label.set_text(self.describe(frame))
+
+        return [self.lines, self.label]
@@ -0,0 +1,212 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from sorting_algorithms import MergePassView, sort_unrecorded
+from sorting_trace import Recorder, ViewRecorder
+
+
+MIN_MERGE_BLOCK = 4096  # Elements per buffered read, below which per-read overhead dominates the merge
+
+def sort_run(run, algorithm=None):
+    """Sort one in-memory run, with NumPy by default or a named `SortingAlgorithms` method."""
+    if algorithm is None:
+        run.sort(kind='stable')
+
+        return run
+
+    return sort_unrecorded(run, algorithm)
+
+
+def merge_runs(spill_path, bounds, output, dtype, block):
+    """Merge the sorted runs stored back to back in `spill_path` into the open `output` file.
+
+    Each run is read sequentially `block` elements at a time. Every round,
+    everything not larger than the smallest last-buffered value is safe to
+    emit, so those prefixes are merged and written in one piece; at least
+    one buffer is used up per round. Yields the number of elements written
+    after each round.
+    """
+    itemsize = np.dtype(dtype).itemsize
+    readers, buffers, remaining = [], [], []
+
+    try:
+        for lo, hi in zip(bounds, bounds[1:]):
+            reader = open(spill_path, 'rb')
+            reader.seek(lo * itemsize)
+            readers.append(reader)
+            buffers.append(np.fromfile(reader, dtype=dtype, count=min(block, hi - lo)))
+            remaining.append(hi - lo - len(buffers[-1]))
+
+        written = 0
+
+        while any(len(buffer) for buffer in buffers):
+            live = [r for r, buffer in enumerate(buffers) if len(buffer)]
+            bound = min(buffers[r][-1] for r in live)
+            pieces = []
+
+            for r in live:
+                cut = np.searchsorted(buffers[r], bound, side='right')
+                pieces.append(buffers[r][:cut])
+                buffers[r] = buffers[r][cut:]
+
+                if not len(buffers[r]) and remaining[r]:
+                    buffers[r] = np.fromfile(readers[r], dtype=dtype, count=min(block, remaining[r]))
+                    remaining[r] -= len(buffers[r])
+
+            merged = np.concatenate(pieces)
+            merged.sort(kind='stable')
+            merged.tofile(output)
+            written += len(merged)
+
+            yield written
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+def external_sort(input_path, output_path, dtype=np.int64, memory_budget=64 * 2 ** 20, algorithm=None, recorder=None):
+    """Sort a raw binary integer file into `output_path` without loading it whole.
+
+    The input is read through `np.memmap` in runs of `memory_budget` bytes;
+    each run is sorted in memory and spilled to a temporary file, then the
+    runs are k-way merged with buffered sequential reads and writes. The
+    fan-in of a merge is capped so each run's buffer holds at least
+    `MIN_MERGE_BLOCK` elements; with more runs than the fan-in, groups of
+    runs are merged into longer ones first, pass by pass. Budgets smaller than
+    three such blocks are rounded up to them, for the runs and the merge
+    buffers alike.
+
+    This is a generator, like the `SortingAlgorithms` methods: it reports
+    `run`, `pass` and `merge` events to `recorder` and yields a frame after every
+    spilled run and merged block. A frame's array is the logical state of
+    the data (sorted runs or merged prefix, then the rest), its current
+    index is the last position finished and its min index is the start of
+    the current run. Frames are live views by default, since a copy of a
+    file too large for memory would not fit either; pass a
+    `SnapshotRecorder` to get copies of small files.
+    """
+    rec = recorder if recorder is not None else ViewRecorder()
+    dtype = np.dtype(dtype)
+    n = os.path.getsize(input_path) // dtype.itemsize
+    run_length = max(3 * MIN_MERGE_BLOCK, memory_budget // dtype.itemsize)  # Room for a merge of two runs
+
+    with open(output_path, 'wb') as output:
+        output.truncate(n * dtype.itemsize)  # Sizing the file up front so it can be mapped while it fills
+
+    if n == 0:
+        return
+
+    data = np.memmap(input_path, dtype=dtype, mode='r', shape=(n,))
+    bounds = list(range(0, n, run_length)) + [n]
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        spill_path = os.path.join(spill_dir, 'runs.bin')
+
+        with open(spill_path, 'wb') as spill:
+            spill.truncate(n * dtype.itemsize)
+
+        # The runs are spilled back to back into one file, so sorted runs
+        # followed by the unread input form the state shown while spilling
+        view = MergePassView(data, np.memmap(spill_path, dtype=dtype, mode='r', shape=(n,)))
+
+        with open(spill_path, 'r+b') as spill:
+            for lo, hi in zip(bounds, bounds[1:]):
+                sort_run(np.array(data[lo:hi]), algorithm).tofile(spill)
+                spill.flush()
+                view.boundary = hi
+                rec.event('run', lo, hi)
+
+                yield rec.frame(view, hi - 1, lo)
+
+        if len(bounds) == 2:
+            # A single run is already the sorted output
+            view.dst.tofile(output_path)
+            rec.event('merge', n, n)
+
+            return
+
+        # Input buffers for every run merged at once plus room for the merged block
+        fan_in = max(2, run_length // MIN_MERGE_BLOCK - 1)
+        block = max(MIN_MERGE_BLOCK, run_length // (fan_in + 1))
+        src_path, spare_path = spill_path, os.path.join(spill_dir, 'merged.bin')
+
+        with open(spare_path, 'wb') as spill:
+            spill.truncate(n * dtype.itemsize)  # Intermediate passes alternate between the two spill files
+
+        while True:
+            final = len(bounds) - 1 <= fan_in
+            dst_path = output_path if final else spare_path
+
+            view = MergePassView(view.dst, np.memmap(dst_path, dtype=dtype, mode='r', shape=(n,)))
+            groups = range(0, len(bounds) - 1, fan_in)
+            rec.event('pass', len(bounds) - 1, len(groups))
+
+            with open(dst_path, 'r+b') as output:
+                for g in groups:
+                    group = bounds[g:g + fan_in + 1]
+
+                    for written in merge_runs(src_path, group, output, dtype, block):
+                        output.flush()
+                        view.boundary = group[0] + written
+                        rec.event('merge', view.boundary, n)
+
+                        yield rec.frame(view, view.boundary - 1, group[0])
+
+            if final:
+                return
+
+            bounds = [bounds[g] for g in groups] + [n]
+            src_path, spare_path = dst_path, src_path
+
+
+class ProgressPrinter(Recorder):
+    """Recorder that prints run and merge events as they happen."""
+
+    def __init__(self, total, stream=sys.stderr):
+        """Print progress against `total` elements to `stream`."""
+        self.total = total
+        self.stream = stream
+        self.runs = 0
+
+    def event(self, kind, *indices):
+        if kind == 'run':
+            self.runs += 1
+            print(f"run {self.runs}: sorted [{indices[0]}, {indices[1]})", file=self.stream)
+        elif kind == 'pass':
+            print(f"\npass: merging {indices[0]} runs into {indices[1]}", file=self.stream)
+        elif kind == 'merge':
+            print(f"\rmerged {indices[0]}/{self.total} ({100 * indices[0] // max(1, self.total)}%)", end="", file=self.stream)
+
+
+def parse_size(text):
+    """Parse a byte count such as 512K, 64M or 2G."""
+    units = {'K': 2 ** 10, 'M': 2 ** 20, 'G': 2 ** 30}
+
+    if text[-1:].upper() in units:
+        return int(float(text[:-1]) * units[text[-1].upper()])
+
+    return int(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sort a raw binary integer file larger than memory.")
+    parser.add_argument("input", help="Raw binary file of fixed-width integers")
+    parser.add_argument("output", help="File to write the sorted integers to")
+    parser.add_argument("--dtype", default="int64", help="NumPy dtype of the elements, e.g. int32 or <i8")
+    parser.add_argument("--memory", type=parse_size, default=64 * 2 ** 20, help="Memory budget per run, e.g. 512M")
+    parser.add_argument("--algorithm", default=None, help="SortingAlgorithms method for the runs (NumPy's sort by default)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total = os.path.getsize(args.input) // np.dtype(args.dtype).itemsize
+    printer = ProgressPrinter(total)
+
+    for _ in external_sort(args.input, args.output, args.dtype, args.memory, args.algorithm, recorder=printer):
+        pass
+
+    print(f"\n{total} elements in {printer.runs} runs sorted in {time.perf_counter() - start:.2f}s", file=sys.stderr)
@@ -0,0 +1,142 @@
+import argparse
+import os
+
+import matplotlib
+
+# Using 'TkAgg' backend to open a separate window, unless MPLBACKEND selects another (e.g. Agg on headless machines)
+if 'MPLBACKEND' not in os.environ:
+    matplotlib.use('TkAgg')
+import matplotlib.animation as animation
+import matplotlib.pyplot as plt
+import numpy as np
+
+from bar_renderer import create_renderer
+from external_sort import external_sort, parse_size
+from frame_streaming import PrefetchedFrameStream
+from sorting_trace import Recorder
+
+
+class SampledRecorder(Recorder):
+    """Recorder that turns each `external_sort` frame into a small sample plus a progress line.
+
+    Only the values at `positions` are read from the (memory-mapped) state,
+    so a frame costs as many reads as there are samples, never a copy of
+    the file. Run, pass and merge events update the progress line.
+    """
+
+    def __init__(self, positions, total):
+        """Sample the ascending `positions` of a sort of `total` elements."""
+        self.positions = positions
+        self.total = total
+        self.runs = 0
+        self.status = ""
+
+    def event(self, kind, *indices):
+        if kind == 'run':
+            self.runs += 1
+            self.status = f"run {self.runs}: sorted [{indices[0]:,}, {indices[1]:,})"
+        elif kind == 'pass':
+            self.status = f"pass: merging {indices[0]} runs into {indices[1]}"
+        elif kind == 'merge':
+            self.status = f"merged {indices[0]:,}/{self.total:,} ({100 * indices[0] // max(1, self.total)}%)"
+
+    def sample_index(self, i):
+        """Return the sample drawn at or before position i, or -1 for none."""
+
+        return int(np.searchsorted(self.positions, i, side='right')) - 1 if i >= 0 else -1
+
+    def frame(self, arr, current_index, min_index):
+        """Return `(samples, current sample, min sample, progress line)`."""
+
+        return arr.take(self.positions), self.sample_index(current_index), self.sample_index(min_index), self.status
+
+
+class ExternalSortVisualizer:
+    """Play an external sort of a binary integer file while it runs.
+
+    The sort itself runs on a background thread through a prefetching
+    stream, and every frame shows `samples` evenly spaced positions of the
+    data plus the latest run, pass or merge event, so files larger than
+    memory can be watched without ever being loaded.
+    """
+
+    def __init__(self, input_path, output_path, dtype=np.int64, memory_budget=64 * 2 ** 20, algorithm=None, samples=2000, dark_mode=False, interval=50, blit=False):
+        """Start sorting `input_path` into `output_path` and open the window that follows it."""
+        data = np.memmap(input_path, dtype=dtype, mode='r')
+
+        if len(data) == 0:
+            raise ValueError(f"'{input_path}' holds no elements to sort.")
+
+        self.dark_mode = dark_mode
+        self.interval = interval
+        self.blit = blit
+        self.total = len(data)
+        self.positions = np.unique(np.linspace(0, self.total - 1, min(self.total, samples)).astype(np.int64))
+        self.value_range = (min(0, int(data.min())), int(data.max()))  # One sequential scan of the file
+        self.fig, self.ax, self.renderer, self.status = self.initial_plot(np.asarray(data[self.positions]))
+        del data
+
+        recorder = SampledRecorder(self.positions, self.total)
+        self.frames = PrefetchedFrameStream(external_sort(input_path, output_path, dtype, memory_budget, algorithm, recorder=recorder))
+        self.ani = None
+        self.create_animation()
+
+    def initial_plot(self, sample):
+        """Draw the sampled input with a progress line above it."""
+        if self.dark_mode:
+            plt.style.use("dark_background")
+
+        current_color = "white" if self.dark_mode else "yellow"
+        fig, ax = plt.subplots()
+
+        ax.set_title("External sort", loc='left')
+        ax.set_xlabel(f"Position ({len(sample):,} of {self.total:,} sampled)")
+        ax.set_ylabel("Value")
+        ax.set_xlim(-0.5, len(sample) - 0.5)  # Centering the bars
+        ax.set_ylim(self.value_range[0], self.value_range[1] + 10)
+        ax.set_xticks([])
+
+        renderer = create_renderer(ax, sample, color="cyan", current_color=current_color, min_color="green")
+        status = ax.text(0.98, 0.95, "reading runs", transform=ax.transAxes, ha='right', va='top')
+
+        return fig, ax, renderer, status
+
+    def update_plot(self, frame):
+        """Draw one sampled frame and its progress line."""
+        sample, current_index, min_index, status = frame
+        self.status.set_text(status)
+
+        return self.renderer.update(sample, current_index, min_index) + [self.status]
+
+    def create_animation(self):
+        """Pull frames from the running sort until it finishes."""
+        self.ani = animation.FuncAnimation(
+            self.fig,
+            self.update_plot,
+            frames=self.frames,
+            interval=self.interval,
+            repeat=False,
+            blit=self.blit,
+            cache_frame_data=False
+        )
+
+        # Stopping the sort if the window is closed before it finishes
+        self.fig.canvas.mpl_connect('close_event', lambda event: self.frames.close())
+
+        plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch an external sort of a raw binary integer file.")
+    parser.add_argument("input", help="Raw binary file of fixed-width integers")
+    parser.add_argument("output", help="File to write the sorted integers to")
+    parser.add_argument("--dtype", default="int64", help="NumPy dtype of the elements, e.g. int32 or <i8")
+    parser.add_argument("--memory", type=parse_size, default=64 * 2 ** 20, help="Memory budget per run, e.g. 512M")
+    parser.add_argument("--algorithm", default=None, help="SortingAlgorithms method for the runs (NumPy's sort by default)")
+    parser.add_argument("--samples", type=int, default=2000, help="Positions shown per frame")
+    parser.add_argument("--interval", type=int, default=50, help="Milliseconds between frames")
+    parser.add_argument("--blit", action="store_true", help="Redraw only the bars and the progress line each frame")
+    parser.add_argument("--dark", action="store_true", help="Use the dark mode colors")
+    args = parser.parse_args()
+
+    ExternalSortVisualizer(args.input, args.output, args.dtype, args.memory, args.algorithm, args.samples, args.dark, args.interval, args.blit)
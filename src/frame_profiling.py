@@ -0,0 +1,143 @@
+import cProfile
+import json
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+
+
+PHASES = ('step', 'update', 'draw')  # Frame source advance, update_plot, canvas draw
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """Time the phases of every animation frame and keep rolling percentiles.
+
+    A frame starts when the frame source is asked for its next item, so it
+    covers that step, the `update_plot` call for it and the draw that
+    follows. Each phase keeps its last `window` durations for the
+    percentiles, next to the `frame` period (start to start), which shows
+    stutters that none of the phases account for, e.g. a late timer. Every
+    finished frame is also appended to `timeline` for export.
+    """
+
+    def __init__(self, window=240):
+        """Keep percentiles over the last `window` frames."""
+        self.window = window
+        self.recent = {phase: deque(maxlen=window) for phase in PHASES + ('frame',)}
+        self.timeline = []
+        self.origin = time.perf_counter()
+        self.current = None  # Phase durations of the frame in progress
+        self.started = None
+
+    def next_frame(self):
+        """Finish the frame in progress, if any, and start timing a new one."""
+        now = time.perf_counter()
+
+        if self.current is not None:
+            period = now - self.started
+
+            for phase, seconds in self.current.items():
+                self.recent[phase].append(seconds)
+            self.recent['frame'].append(period)
+
+            self.timeline.append({
+                'frame': len(self.timeline),
+                'start': self.started - self.origin,
+                'period': period,
+                **self.current,
+            })
+
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.started = now
+
+    @contextmanager
+    def measure(self, phase):
+        """Add the time spent in the block to `phase` of the current frame."""
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            if self.current is not None:  # Draws before the first frame are not attributed
+                self.current[phase] += time.perf_counter() - start
+
+    def timed(self, function, phase):
+        """Wrap `function` so every call is measured as `phase`."""
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.measure(phase):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def timed_frames(self, frames):
+        """Yield the items of `frames`, starting a frame and timing the `step` that produces each."""
+        iterator = iter(frames)
+
+        while True:
+            self.next_frame()
+
+            with self.measure('step'):
+                item = next(iterator, StopIteration)
+
+            if item is StopIteration:
+                self.current = None  # Nothing follows; draws while idle are not attributed
+                return
+
+            yield item
+
+    def percentiles(self, phase):
+        """Return the p50, p95 and p99 of `phase` over the window, in seconds."""
+        if not self.recent[phase]:
+            return (0.0,) * len(PERCENTILES)
+
+        return tuple(np.percentile(self.recent[phase], PERCENTILES))
+
+    def summary(self):
+        """Format the percentiles of every phase as a small table in milliseconds."""
+        lines = ["ms      " + "".join(f"{f'p{p}':>7}" for p in PERCENTILES)]
+
+        for phase in PHASES + ('frame',):
+            lines.append(f"{phase:<8}" + "".join(f"{1000 * value:7.2f}" for value in self.percentiles(phase)))
+
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Write the per-frame timeline (seconds) and the current percentiles to a JSON file."""
+        report = {
+            'window': self.window,
+            'percentiles': {
+                phase: dict(zip((f'p{p}' for p in PERCENTILES), self.percentiles(phase)))
+                for phase in PHASES + ('frame',)
+            },
+            'timeline': self.timeline,
+        }
+
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=1)
+
+
+def profile_run(frames, path=None):
+    """Exhaust the frame generator `frames` under cProfile and return its stats.
+
+    Generators run nothing until iterated, so passing a freshly created one
+    profiles the whole algorithm run. The stats are also dumped to `path`,
+    for `python -m pstats` or snakeviz, when it is given.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    try:
+        for _ in frames:
+            pass
+    finally:
+        profiler.disable()
+
+    if path is not None:
+        profiler.dump_stats(path)
+
+    return pstats.Stats(profiler)
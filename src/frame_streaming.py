@@ -0,0 +1,151 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class PrefetchedFrameStream:
+    """Iterate over a frame generator that a background thread runs ahead of playback.
+
+    The producer thread fills a bounded queue, so the first frame is available
+    as soon as the algorithm yields it and at most `prefetch` frames are held
+    in memory regardless of how long the sort runs.
+    """
+
+    _DONE = object()  # Sentinel marking the end of the generator
+
+    def __init__(self, frames, prefetch=64):
+        """Start prefetching from the `frames` iterable."""
+        self.frames = frames
+        self.queue = queue.Queue(maxsize=prefetch)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._produce, daemon=True)
+        self.thread.start()
+
+    def _produce(self):
+        """Pull frames from the generator into the queue until exhausted or stopped."""
+        try:
+            for frame in self.frames:
+                if not self._put(frame):
+                    return
+        except Exception as error:  # Re-raised on the consumer side
+            self._put(error)
+            return
+
+        self._put(self._DONE)
+
+    def _put(self, item):
+        """Block until there is room in the queue; return False once stopped."""
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def __iter__(self):
+        """Yield frames in order as the producer makes them available."""
+        while True:
+            item = self.queue.get()
+
+            if item is self._DONE:
+                self.queue.put(item)  # Later iterations end at once instead of blocking
+                return
+            if isinstance(item, Exception):
+                raise item
+
+            yield item
+
+    def close(self):
+        """Stop the producer thread and drop any prefetched frames."""
+        self.stop_event.set()
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+        self.thread.join()
+
+
+def run_in_background(function, *args):
+    """Call `function` on a daemon thread and return a Future for its result.
+
+    Unlike an executor's threads, a daemon thread never holds up interpreter
+    exit when the window is closed in the middle of a long computation.
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(function(*args))
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    return future
+
+
+class FrameDecimator:
+    """Choose how many states to advance per drawn frame so playback keeps a target pace.
+
+    The time between consecutive `step` calls (one timer tick plus its draw)
+    is smoothed into `tick`. Without a `duration`, states advance at `fps`
+    per second, so a draw slower than the timer interval skips states rather
+    than slowing playback down. With a `duration` and the `total` number of
+    states, the rate is recomputed each tick from the states and time left,
+    so playback ends close to `duration` seconds after it starts.
+    """
+
+    def __init__(self, fps, total=None, duration=None, smoothing=0.25):
+        """Pace playback at `fps` states per second, or over `duration` seconds when both it and `total` are given."""
+        self.fps = fps
+        self.total = total
+        self.duration = duration
+        self.smoothing = smoothing
+        self.tick = 1.0 / fps  # Smoothed seconds per drawn frame, seeded with the timer interval
+        self.position = 0  # States advanced so far
+        self.start = None
+        self.last = None
+
+    def step(self):
+        """Return how many states to advance before drawing the next frame."""
+        now = time.perf_counter()
+
+        if self.last is None:
+            self.start = now
+        else:
+            self.tick += self.smoothing * ((now - self.last) - self.tick)
+
+        self.last = now
+
+        if self.duration and self.total:
+            remaining_time = self.duration - (now - self.start)
+            rate = (self.total - self.position) / max(remaining_time, self.tick)
+        else:
+            rate = self.fps
+
+        k = max(1, round(rate * self.tick))
+        self.position += k
+
+        return k
+
+
+def decimate(frames, decimator):
+    """Yield every k-th item of `frames`, asking `decimator` for k each time; the last item is always yielded."""
+    k = decimator.step()
+    pending = 0
+    item = None
+
+    for item in frames:
+        pending += 1
+
+        if pending >= k:
+            yield item
+
+            pending = 0
+            k = decimator.step()
+
+    if pending:
+        yield item
@@ -0,0 +1,220 @@
+import argparse
+import shutil
+import struct
+import subprocess
+import time
+import warnings
+import zlib
+
+import matplotlib.style
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+
+from bar_renderer import create_renderer
+from input_generators import PRODUCERS, generate
+from sorting_algorithms import SortingAlgorithms
+from sorting_trace import ViewRecorder
+
+
+class HeadlessRenderer:
+    """Render sorting frames offscreen on an Agg canvas, with no GUI backend."""
+
+    def __init__(self, algorithm, arr, dark_mode=False, size=(640, 480), dpi=100):
+        """Build the figure for `arr` in the same layout as the visualizers."""
+        self.algorithm = algorithm
+        style = "dark_background" if dark_mode else "default"
+        text_color = "white" if dark_mode else "black"
+
+        with matplotlib.style.context(style):
+            self.fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+            self.canvas = FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_subplot()
+
+            self.ax.set_title(f"Sorting Visualization for: {algorithm}", color=text_color, loc='left')
+            self.ax.set_xlabel("Index", color=text_color)
+            self.ax.set_ylabel("Value", color=text_color)
+            self.ax.set_xlim(-0.5, len(arr) - 0.5)  # Centering the bars
+            self.ax.set_ylim(0, max(arr) + 10)
+
+            current_color = "white" if dark_mode else "yellow"
+            self.renderer = create_renderer(self.ax, arr, color="cyan", current_color=current_color, min_color="green")
+            self.ax.tick_params(colors=text_color)
+
+            legend_handles = [
+                Patch(color=current_color, label="Current Index"),
+                Patch(color="green", label="Minimum Index")
+            ]
+            self.ax.legend(handles=legend_handles, loc="upper left", facecolor="gray" if dark_mode else "white", framealpha=0.8)
+
+        # Caching everything but the bars once, then only the bars are drawn per frame
+        self.renderer.collection.set_animated(True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.width, self.height = self.canvas.get_width_height()
+
+    def render(self, frame, changed=None):
+        """Draw one `(arr_data, current_index, min_index)` frame and return its RGB buffer."""
+        arr_data, current_index, min_index = frame
+        self.renderer.update(arr_data, current_index, min_index, changed)
+
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.renderer.collection)
+
+        rgba = np.asarray(self.canvas.buffer_rgba())
+
+        return rgba[:, :, :3].tobytes()
+
+
+class FFmpegWriter:
+    """Pipe raw RGB frames into a local ffmpeg process (mp4, gif, webm, ...)."""
+
+    def __init__(self, path, width, height, fps):
+        """Start ffmpeg reading raw frames of the given size from stdin."""
+        executable = shutil.which("ffmpeg")
+
+        if executable is None:
+            raise RuntimeError("ffmpeg was not found; export to '.png' for an animated PNG instead.")
+
+        command = [
+            executable, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps),
+            "-i", "-",
+        ]
+
+        if not path.endswith(".gif"):
+            command += ["-pix_fmt", "yuv420p"]
+
+        self.process = subprocess.Popen(command + [path], stdin=subprocess.PIPE)
+
+    def write(self, rgb):
+        """Send one frame to ffmpeg."""
+        self.process.stdin.write(rgb)
+
+    def close(self):
+        """Finish the video and fail if ffmpeg did."""
+        self.process.stdin.close()
+
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+
+
+def compress_frame(rgb, width, height):
+    """Encode a raw RGB frame as zlib-compressed PNG scanlines."""
+    rows = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width * 3)
+    # Every scanline starts with filter type 0 (None)
+    scanlines = np.hstack([np.zeros((height, 1), dtype=np.uint8), rows])
+
+    return zlib.compress(scanlines.tobytes(), 6)
+
+
+class APNGWriter:
+    """Write raw RGB frames as an animated PNG using only the standard library."""
+
+    def __init__(self, path, width, height, fps):
+        """Open `path` and write the PNG header; the frame count is patched on close."""
+        self.file = open(path, "wb")
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames = 0
+        self.sequence = 0  # Sequence number shared by fcTL and fdAT chunks
+
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        self.actl_offset = self.file.tell()
+        self._chunk(b"acTL", struct.pack(">II", 0, 0))
+
+    def _chunk(self, kind, data):
+        """Write one length-prefixed, CRC-terminated PNG chunk."""
+        self.file.write(struct.pack(">I", len(data)) + kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write(self, rgb):
+        """Append one frame."""
+        self.write_compressed(compress_frame(rgb, self.width, self.height))
+
+    def write_compressed(self, data):
+        """Append one frame already encoded by `compress_frame`."""
+        self._chunk(b"fcTL", struct.pack(">IIIIIHHBB", self.sequence, self.width, self.height, 0, 0, 1, self.fps, 0, 0))
+        self.sequence += 1
+
+        if self.frames == 0:
+            self._chunk(b"IDAT", data)
+        else:
+            self._chunk(b"fdAT", struct.pack(">I", self.sequence) + data)
+            self.sequence += 1
+
+        self.frames += 1
+
+    def close(self):
+        """Write the trailer and the final frame count."""
+        self._chunk(b"IEND", b"")
+        self.file.seek(self.actl_offset)
+        self._chunk(b"acTL", struct.pack(">II", self.frames, 0))
+        self.file.close()
+
+
+def open_writer(path, width, height, fps):
+    """Choose a writer from the output file extension."""
+    if path.endswith((".png", ".apng")):
+        return APNGWriter(path, width, height, fps)
+
+    return FFmpegWriter(path, width, height, fps)
+
+
+def export_animation(algorithm, arr, path, fps=30, dark_mode=False, size=(640, 480), dpi=100, target_fps=None):
+    """Render every frame of `algorithm` sorting `arr` offscreen into `path`.
+
+    Returns the number of frames, the elapsed seconds and the achieved render
+    throughput. When `target_fps` is given, a warning is issued if rendering
+    ran slower than that throughput target.
+    """
+    renderer = HeadlessRenderer(algorithm, arr, dark_mode=dark_mode, size=size, dpi=dpi)
+    # Frames are rendered as soon as they are yielded, so no snapshot copies are needed
+    sorting_method = getattr(SortingAlgorithms(recorder=ViewRecorder()), algorithm, None)
+
+    if sorting_method is None:
+        raise ValueError(f"Sorting algorithm '{algorithm}' is not defined.")
+
+    writer = open_writer(path, renderer.width, renderer.height, fps)
+    frames = 0
+    start = time.perf_counter()
+
+    try:
+        for frame in sorting_method(list(arr)):
+            writer.write(renderer.render(frame))
+            frames += 1
+
+        # An input that needs no work still gets its initial state, since an empty animation is not a valid file
+        if frames == 0:
+            writer.write(renderer.render((list(arr), -1, -1)))
+            frames = 1
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {"frames": frames, "seconds": elapsed, "render_fps": frames / elapsed if elapsed else 0.0}
+
+    if target_fps is not None and stats["render_fps"] < target_fps:
+        warnings.warn(f"Rendered {stats['render_fps']:.1f} frames/s, below the target of {target_fps} frames/s.")
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a sorting animation without a display.")
+    parser.add_argument("algorithm", help="SortingAlgorithms method name, e.g. bubble_sort")
+    parser.add_argument("output", help="Output file; .png/.apng writes an animated PNG, anything else goes through ffmpeg")
+    parser.add_argument("--size", type=int, default=15, help="Number of elements to sort")
+    parser.add_argument("--shape", default="uniform", choices=PRODUCERS, help="Shape of the generated input")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible input")
+    parser.add_argument("--fps", type=int, default=30, help="Playback frames per second of the output")
+    parser.add_argument("--target-fps", type=float, default=None, help="Warn if rendering is slower than this")
+    parser.add_argument("--dark", action="store_true", help="Use the dark mode colors")
+    args = parser.parse_args()
+
+    arr = generate(args.shape, args.size, seed=args.seed).tolist()
+    stats = export_animation(args.algorithm, arr, args.output, fps=args.fps, dark_mode=args.dark, target_fps=args.target_fps)
+    print(f"{stats['frames']} frames in {stats['seconds']:.2f}s ({stats['render_fps']:.1f} frames/s)")
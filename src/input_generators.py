@@ -0,0 +1,121 @@
+import numpy as np
+
+
+ZIPF_TABLE_LIMIT = 2 ** 22  # Widest value range whose Zipf weights are tabulated
+
+
+def uniform(size, value_range=(1, 100), seed=None):
+    """Integers drawn uniformly from `value_range`, both ends included.
+
+    `seed` may be an int, None or a `np.random.Generator` to keep drawing from;
+    every producer returns an int64 NumPy array.
+    """
+    rng = np.random.default_rng(seed)
+
+    return rng.integers(value_range[0], value_range[1], size=size, endpoint=True, dtype=np.int64)
+
+
+def sorted_values(size, value_range=(1, 100), seed=None):
+    """Uniform integers in ascending order."""
+    values = uniform(size, value_range, seed)
+    values.sort()
+
+    return values
+
+
+def nearly_sorted(size, value_range=(1, 100), swaps=None, seed=None):
+    """Ascending integers with `swaps` random pairs exchanged (about 5% of the size by default)."""
+    rng = np.random.default_rng(seed)
+    values = sorted_values(size, value_range, rng)
+
+    if size > 1:
+        swaps = min(size // 2, max(1, size // 20) if swaps is None else swaps)
+        # Distinct positions make the swaps independent, so they are applied at once
+        positions = rng.choice(size, size=2 * swaps, replace=False)
+        i, j = positions[:swaps], positions[swaps:]
+        values[i], values[j] = values[j], values[i]
+
+    return values
+
+
+def reversed_values(size, value_range=(1, 100), seed=None):
+    """Uniform integers in descending order."""
+
+    return sorted_values(size, value_range, seed)[::-1].copy()
+
+
+def few_unique(size, value_range=(1, 100), unique=4, seed=None):
+    """Integers picked from only `unique` distinct values of `value_range`."""
+    rng = np.random.default_rng(seed)
+    choices = np.linspace(value_range[0], value_range[1], unique + 2, dtype=np.int64)[1:-1]
+
+    return rng.choice(choices, size=size)
+
+
+def organ_pipe(size, value_range=(1, 100), seed=None):
+    """Uniform integers rising to a peak in the middle and falling again."""
+    values = sorted_values(size, value_range, seed)
+
+    return np.concatenate((values[::2], values[1::2][::-1]))
+
+
+def sawtooth(size, value_range=(1, 100), teeth=4, seed=None):
+    """`teeth` ascending ramps spanning `value_range`, one after the other."""
+    period = max(1, -(-size // teeth))
+    phase = np.arange(size, dtype=np.int64) % period
+
+    return value_range[0] + phase * (value_range[1] - value_range[0]) // max(1, period - 1)
+
+
+def zipf(size, value_range=(1, 100), exponent=1.5, seed=None):
+    """Zipf-distributed integers: the lowest values are by far the most frequent.
+
+    Ranks are drawn by inverting the cumulative weights of the bounded
+    distribution; ranges wider than `ZIPF_TABLE_LIMIT` draw from the
+    unbounded one instead and wrap ranks around to stay in range.
+    """
+    rng = np.random.default_rng(seed)
+    span = value_range[1] - value_range[0] + 1
+
+    if span > ZIPF_TABLE_LIMIT:
+        return value_range[0] + (rng.zipf(exponent, size=size) - 1) % span
+
+    weights = np.cumsum(np.arange(1, span + 1, dtype=float) ** -exponent)
+
+    return value_range[0] + np.searchsorted(weights, rng.random(size) * weights[-1], side='right')
+
+
+PRODUCERS = {
+    'uniform': uniform,
+    'sorted': sorted_values,
+    'nearly_sorted': nearly_sorted,
+    'reversed': reversed_values,
+    'few_unique': few_unique,
+    'organ_pipe': organ_pipe,
+    'sawtooth': sawtooth,
+    'zipf': zipf,
+}
+
+
+def generate(shape, size, value_range=(1, 100), seed=None, **options):
+    """Build an input of the named shape; extra options go to its producer."""
+    producer = PRODUCERS.get(shape)
+
+    if producer is None:
+        raise ValueError(f"Input shape '{shape}' is not defined.")
+
+    return producer(size, value_range, seed=seed, **options)
+
+
+def load_binary(path, dtype=np.int64, mmap=False):
+    """Load a raw binary integer file, memory-mapped read-only if `mmap` is set."""
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    return np.fromfile(path, dtype=dtype)
+
+
+def load_csv(path, column=0, delimiter=',', header=False, dtype=np.int64):
+    """Load one integer column of a CSV file, skipping the first line if it is a `header`."""
+
+    return np.loadtxt(path, delimiter=delimiter, usecols=column, skiprows=1 if header else 0, dtype=dtype, ndmin=1)
@@ -0,0 +1,127 @@
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from headless_export import APNGWriter, HeadlessRenderer, compress_frame, export_animation, open_writer
+from input_generators import PRODUCERS, generate
+from sorting_algorithms import SortingAlgorithms
+from sorting_trace import TraceReplayer
+
+
+def segment_frames(replayer):
+    """Yield `(frame, changed)` pairs; the figure starts from the full input, so the first frame diffs every bar."""
+    for k in range(len(replayer)):
+        frame = replayer[k]
+
+        yield frame, replayer.dirty if k else None
+
+
+def render_segment(task):
+    """Render one frame range in a worker process with its own figure.
+
+    Animated PNG output returns the compressed frames for the parent to
+    stitch; video output is written to the task's segment file.
+    """
+    algorithm, arr, segment, settings, segment_path = task
+    renderer = HeadlessRenderer(algorithm, arr, dark_mode=settings["dark_mode"], size=settings["size"], dpi=settings["dpi"])
+    frames = segment_frames(TraceReplayer(segment))
+
+    if segment_path is None:
+        return [compress_frame(renderer.render(frame, changed), renderer.width, renderer.height) for frame, changed in frames]
+
+    writer = open_writer(segment_path, renderer.width, renderer.height, settings["fps"])
+
+    try:
+        for frame, changed in frames:
+            writer.write(renderer.render(frame, changed))
+    finally:
+        writer.close()
+
+    return segment_path
+
+
+def concat_segments(paths, output):
+    """Join the per-worker video segments in order with ffmpeg's concat demuxer."""
+    list_path = os.path.join(os.path.dirname(paths[0]), "segments.txt")
+
+    with open(list_path, "w") as f:
+        f.writelines(f"file '{path}'\n" for path in paths)
+
+    command = [shutil.which("ffmpeg"), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path]
+
+    if not output.endswith(".gif"):
+        command += ["-c", "copy"]  # Segments share codec settings, so no re-encode is needed
+
+    subprocess.run(command + [output], check=True)
+
+
+def export_animation_parallel(algorithm, arr, path, workers=None, frames_per_task=256, fps=30, dark_mode=False, size=(640, 480), dpi=100):
+    """Render `algorithm` sorting `arr` into `path` using a pool of worker processes.
+
+    The operation trace is split into ranges of `frames_per_task` frames;
+    each task carries the array state at its first frame plus its slice of
+    the operation log, so workers render independently and the results are
+    stitched back in order.
+    """
+    start = time.perf_counter()
+    replayer = TraceReplayer(SortingAlgorithms().trace(algorithm, list(arr)))
+
+    if len(replayer) == 0:
+        # No ranges to split; the serial export writes the initial state as the only frame
+        return export_animation(algorithm, arr, path, fps=fps, dark_mode=dark_mode, size=size, dpi=dpi)
+
+    settings = {"fps": fps, "dark_mode": dark_mode, "size": size, "dpi": dpi}
+    ranges = [(k, min(k + frames_per_task, len(replayer))) for k in range(0, len(replayer), frames_per_task)]
+    apng = path.endswith((".png", ".apng"))
+
+    with tempfile.TemporaryDirectory() as segment_dir:
+        extension = os.path.splitext(path)[1]
+        tasks = (
+            (algorithm, arr, replayer.segment(lo, hi), settings, None if apng else os.path.join(segment_dir, f"{lo:012d}{extension}"))
+            for lo, hi in ranges
+        )
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(render_segment, tasks)
+
+            if apng:
+                writer = APNGWriter(path, size[0], size[1], fps)
+
+                try:
+                    # Results arrive in submission order, so frames are stitched as they come
+                    for frames in results:
+                        for data in frames:
+                            writer.write_compressed(data)
+                finally:
+                    writer.close()
+            else:
+                segment_paths = list(results)
+
+        if not apng and segment_paths:
+            concat_segments(segment_paths, path)
+
+    elapsed = time.perf_counter() - start
+
+    return {"frames": len(replayer), "seconds": elapsed, "render_fps": len(replayer) / elapsed if elapsed else 0.0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a sorting animation on several cores.")
+    parser.add_argument("algorithm", help="SortingAlgorithms method name, e.g. bubble_sort")
+    parser.add_argument("output", help="Output file; .png/.apng writes an animated PNG, anything else goes through ffmpeg")
+    parser.add_argument("--size", type=int, default=15, help="Number of elements to sort")
+    parser.add_argument("--shape", default="uniform", choices=PRODUCERS, help="Shape of the generated input")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible input")
+    parser.add_argument("--fps", type=int, default=30, help="Playback frames per second of the output")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to the CPU count)")
+    parser.add_argument("--frames-per-task", type=int, default=256, help="Frames rendered per worker task")
+    parser.add_argument("--dark", action="store_true", help="Use the dark mode colors")
+    args = parser.parse_args()
+
+    arr = generate(args.shape, args.size, seed=args.seed).tolist()
+    stats = export_animation_parallel(args.algorithm, arr, args.output, workers=args.workers, frames_per_task=args.frames_per_task, fps=args.fps, dark_mode=args.dark)
+    print(f"{stats['frames']} frames in {stats['seconds']:.2f}s ({stats['render_fps']:.1f} frames/s)")
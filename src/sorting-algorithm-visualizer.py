@@ -1,5 +1,9 @@
 import matplotlib
-matplotlib.use('TkAgg')  # Using 'TkAgg' backend to open a separate window
+import os
+
+# Using 'TkAgg' backend to open a separate window, unless MPLBACKEND selects another (e.g. Agg on headless machines)
+if 'MPLBACKEND' not in os.environ:
+    matplotlib.use('TkAgg')
 import matplotlib.animation as animation
 from matplotlib.widgets import Button
 import matplotlib.pyplot as plt
@@ -319,7 +323,10 @@ class SortingVisualizerDarkMode:
     def restart_animation(self, event):
         """Restart the animation when the button is clicked."""
         self.unordered_list = self.generate_random_list()
-        self.arr_states = list(self.selection_sort(self.unordered_list.copy()))
+        self.arr_states = list(self.execute_sorting_algorithm(self.unordered_list.copy()))
+
+        # Stopping the previous animation's timer before replacing it
+        self.ani.pause()
 
         # Restarting the animation with the new list
         self.ani = animation.FuncAnimation(
@@ -435,7 +442,10 @@ class SortingVisualizerLightMode:
     def restart_animation(self, event):
         """Restart the animation when the button is clicked."""
         self.unordered_list = self.generate_random_list()
-        self.arr_states = list(self.selection_sort(self.unordered_list.copy()))
+        self.arr_states = list(self.execute_sorting_algorithm(self.unordered_list.copy()))
+
+        # Stopping the previous animation's timer before replacing it
+        self.ani.pause()
 
         # Restarting the animation with the new list
         self.ani = animation.FuncAnimation(
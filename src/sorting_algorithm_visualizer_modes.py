@@ -1,34 +1,86 @@
 import matplotlib
-matplotlib.use('TkAgg')  # Using 'TkAgg' backend to open a separate window
+import os
+
+# Using 'TkAgg' backend to open a separate window, unless MPLBACKEND selects another (e.g. Agg on headless machines)
+if 'MPLBACKEND' not in os.environ:
+    matplotlib.use('TkAgg')
 import matplotlib.animation as animation
-from matplotlib.widgets import Button
+from matplotlib.widgets import Button, Slider
 import matplotlib.pyplot as plt
-import random
+import numpy as np
 from matplotlib.patches import Patch
 
+from bar_renderer import EventMarkers, create_renderer
+from frame_profiling import FrameProfiler, profile_run
+from frame_streaming import FrameDecimator, PrefetchedFrameStream, decimate, run_in_background
+from input_generators import generate
 from sorting_algorithms import SortingAlgorithms
+from sorting_trace import TraceReplayer
+from trace_cache import TraceCache
 
 
 
 class SortingVisualizerLightMode:
 
-    def __init__(self, array_size=15, value_range=(1, 100), algorithm='selection_sort'):
-        """Initialize the sorting visualizer with a given array size and value range."""
+    def __init__(self, array_size=15, value_range=(1, 100), algorithm='selection_sort', playback='snapshot', blit=False, interval=500, shape='uniform', seed=None, cache=True, fps=None, duration=None, profile=False, timeline_path=None, cprofile_path=None):
+        """Initialize the sorting visualizer with a given array size and value range.
+
+        `playback` selects how states are stored: 'snapshot' keeps a copy of the
+        array per frame, 'trace' keeps a keyframed operation trace that a
+        timeline slider can seek and 'stream' pulls frames from a prefetching
+        background thread as it plays. With `blit` only the bars are redrawn
+        over a cached background each tick, which allows a much shorter
+        `interval` (in milliseconds) on large arrays. `shape` names an
+        `input_generators` producer and `seed` makes the inputs reproducible,
+        Reset included. With `cache`, trace playback stores traces in a
+        `TraceCache` and replays a previously seen input without sorting it.
+        Giving `fps` (which replaces `interval`) or a target `duration` in
+        seconds decimates playback: only every k-th state is drawn, with k
+        adapted to the measured draw time so playback keeps that pace.
+        A `duration` needs the number of states up front, so it is rejected
+        for 'stream' playback, whose length is unknown until the sort ends.
+        With `profile`, every frame's generator step, `update_plot` call and
+        canvas draw are timed and their rolling p50/p95/p99 shown in an
+        overlay; the per-frame timeline is written to `timeline_path` as JSON
+        when the window closes. `cprofile_path` receives cProfile stats of
+        one extra run of the algorithm on the first input.
+        """
+        if duration and playback == 'stream':
+            raise ValueError("A target duration is not supported with 'stream' playback, whose frame count is unknown.")
+
         self.array_size = array_size
         self.value_range = value_range
         self.algorithm = algorithm
-        self.unordered_list = self.generate_random_list()
+        self.playback = playback
+        self.blit = blit
+        self.interval = 1000 / fps if fps else interval
+        self.fps = fps
+        self.duration = duration
+        self.shape = shape
+        self.rng = np.random.default_rng(seed)  # Shared by every Reset, so a seeded session replays identically
+        self.trace_cache = TraceCache() if cache and playback == 'trace' else None
+        self.unordered_list = self.generate_input()
+        self.profiler = FrameProfiler() if profile or timeline_path else None
+        self.timeline_path = timeline_path
         # self.arr_states = list(self.selection_sort(self.unordered_list.copy()))
         self.algorithms = SortingAlgorithms()  # Create an instance of SortingAlgorithms
-        self.arr_states = list(self.execute_sorting_algorithm(self.unordered_list.copy()))
-        self.fig, self.ax, self.bars = self.initial_plot(self.unordered_list)
+
+        if cprofile_path:
+            profile_run(self.execute_sorting_algorithm(self.unordered_list.copy()), cprofile_path)
+
+        self.arr_states = self.build_arr_states(self.unordered_list.copy())
+        self.fig, self.ax, self.renderer = self.initial_plot(self.unordered_list)
         self.ani = None
+        self.slider = None
+        self.event_markers = None  # Run and merge bounds, for trace playback
+        self.frame_position = 0  # Next frame index for seekable playback
+        self.next_states = run_in_background(self.prepare_states)  # Ready before Reset is clicked
         self.create_animation()
 
-    def generate_random_list(self):
-        """Generate a random list of integers."""
+    def generate_input(self):
+        """Generate the list of integers to sort."""
 
-        return [random.randint(self.value_range[0], self.value_range[1]) for _ in range(self.array_size)]
+        return generate(self.shape, self.array_size, self.value_range, seed=self.rng).tolist()
 
     def execute_sorting_algorithm(self, arr):
         """Execute the sorting algorithm specified and yield states for visualization."""
@@ -40,6 +92,26 @@ class SortingVisualizerLightMode:
         else:
             raise ValueError(f"Sorting algorithm '{self.algorithm}' is not defined.")
 
+    def prepare_states(self):
+        """Generate the next input and its frame source; runs on a background thread."""
+        arr = self.generate_input()
+
+        return arr, self.build_arr_states(arr.copy())
+
+    def build_arr_states(self, arr):
+        """Build the indexable frame source for the configured playback mode."""
+        if self.playback == 'snapshot':
+            return list(self.execute_sorting_algorithm(arr))
+        elif self.playback == 'trace':
+            if self.trace_cache is not None:
+                return self.trace_cache.replayer(self.algorithm, arr)
+
+            return TraceReplayer(self.algorithms.trace(self.algorithm, arr))
+        elif self.playback == 'stream':
+            return PrefetchedFrameStream(self.execute_sorting_algorithm(arr))
+        else:
+            raise ValueError(f"Playback mode '{self.playback}' is not defined.")
+
     # def selection_sort(self, arr):
     #     """Selection Sort Algorithm with animation yields."""
     #     n = len(arr)
@@ -67,9 +139,8 @@ class SortingVisualizerLightMode:
         ax.set_xlim(-0.5, len(arr) - 0.5)  # Centering the bars
         ax.set_ylim(0, max(arr) + 10)
 
-        # Creating bars with initial array values
-        bar_positions = range(len(arr))
-        bars = ax.bar(bar_positions, arr, color="cyan") 
+        # Creating bars (binned per pixel column for wide arrays) as a single collection
+        renderer = create_renderer(ax, arr, color="cyan", current_color="yellow", min_color="green")
         ax.tick_params()
 
         # Creating custom legend handles
@@ -79,72 +150,255 @@ class SortingVisualizerLightMode:
         ]
         ax.legend(handles=legend_handles, loc="upper left", facecolor="white", framealpha=0.8)
 
-        return fig, ax, bars
+        return fig, ax, renderer
 
     def update_plot(self, frame):
         """Update the plot with the current state."""
-        arr_data, current_index, min_index = self.arr_states[frame]
+        if isinstance(frame, tuple):
+            # Streamed playback (and the final idle frame) hands over the frame itself
+            arr_data, current_index, min_index = frame
+            changed = None
+        else:
+            arr_data, current_index, min_index = self.arr_states[frame]
+            # Trace playback knows which positions changed; snapshots are diffed
+            changed = self.arr_states.dirty if self.playback == 'trace' else None
+
+            if self.slider is not None and not self.blit:
+                # Moving the slider to follow playback must not trigger a seek
+                self.slider.eventson = False
+                self.slider.set_val(frame)
+                self.slider.eventson = True
+
+            if self.event_markers is not None:
+                events = self.event_markers.update(self.arr_states.trace, frame)
+
+                return self.renderer.update(arr_data, current_index, min_index, changed) + events
+
+        return self.renderer.update(arr_data, current_index, min_index, changed)
+
+    def profiled_update(self, frame):
+        """Time `update_plot` for the profiler and refresh the overlay with the percentiles."""
+        with self.profiler.measure('update'):
+            artists = self.update_plot(frame)
+
+        self.overlay.set_text(self.profiler.summary())
+
+        return [*artists, self.overlay]
+
+    def frame_indices(self):
+        """Yield frame indices from the current timeline position onwards."""
+        while self.frame_position < len(self.arr_states):
+            yield self.frame_position
+            self.frame_position += 1
+
+    def seek(self, value):
+        """Jump the animation to the frame selected on the timeline slider."""
+        if len(self.arr_states) == 0:
+            return  # Nothing to seek in, e.g. an already sorted input
+
+        self.frame_position = min(int(value), len(self.arr_states) - 1)  # set_val does not clamp
+        self.update_plot(self.frame_position)
+        self.fig.canvas.draw_idle()
+
+    def frame_source(self):
+        """Yield the frames of the current states, then idle on the final state.
+
+        The animation is never told that the frames ran out, since it would
+        then drop its timer; playback pauses itself instead, and Reset
+        resumes the same animation with a new frame sequence.
+        """
+        if self.playback == 'stream':
+            frames = self.arr_states  # Frames are pulled from the prefetch queue
+        elif self.playback == 'trace':
+            frames = self.frame_indices()  # Indices follow the timeline slider
+        else:
+            frames = range(len(self.arr_states))
 
-        for i, (bar, val) in enumerate(zip(self.bars, arr_data)):
-            # Set bar colors based on current index and min index
-            bar.set_color("yellow" if i == current_index else "green" if i == min_index else "cyan")
-            bar.set_height(val)
-        
-        return self.bars
+        if self.fps or self.duration:
+            # Skipped trace indices are still replayed by the next seek, and a
+            # streamed frame is a full state, so no operation is ever lost
+            total = None if self.playback == 'stream' else len(self.arr_states)
+            frames = decimate(frames, FrameDecimator(1000 / self.interval, total, self.duration))
 
-    def create_animation(self):
-        """Create the animation for the sorting process."""
-        self.ani = animation.FuncAnimation(
+        if self.profiler is not None:
+            frames = self.profiler.timed_frames(frames)  # Decimation skips count towards the step
+
+        yield from frames
+
+        while True:
+            self.finish_playback()
+
+            yield self.renderer.heights, -1, -1  # The final state, without highlights
+
+    def finish_playback(self):
+        """Stop the timer and leave the final state drawn normally until the next Reset."""
+        if self.ani is None:
+            return  # Blitting draws a first frame while the animation is being created
+
+        # Pausing also un-animates blitted bars, so full redraws (resizing,
+        # seeking) keep showing them
+        self.ani.pause()
+
+        if self.slider is not None:
+            self.slider.eventson = False
+            self.slider.set_val(max(0, len(self.arr_states) - 1))
+            self.slider.eventson = True
+
+        self.fig.canvas.draw_idle()
+
+    def new_animation(self):
+        """Create the one FuncAnimation that plays every frame source, Reset included."""
+
+        return animation.FuncAnimation(
             self.fig,
-            self.update_plot,
-            frames=len(self.arr_states),
-            interval=500,
-            repeat=False
+            self.update_plot if self.profiler is None else self.profiled_update,
+            frames=self.frame_source,
+            interval=self.interval,
+            repeat=False,
+            blit=self.blit,
+            cache_frame_data=False
+        )
+
+    def instrument_drawing(self):
+        """Add the performance overlay and time every canvas draw for the profiler."""
+        self.overlay = self.ax.text(
+            0.99, 0.98, self.profiler.summary(), transform=self.ax.transAxes, ha='right', va='top',
+            family='monospace', fontsize=8, color='black', bbox=dict(facecolor='white', alpha=0.7, edgecolor='none')
         )
 
+        # Full redraws go through Figure.draw; blitted frames restore the
+        # background, draw the animated artists on the axes and blit them
+        self.fig.draw = self.profiler.timed(self.fig.draw, 'draw')
+        self.ax.draw_artist = self.profiler.timed(self.ax.draw_artist, 'draw')
+        self.fig.canvas.restore_region = self.profiler.timed(self.fig.canvas.restore_region, 'draw')
+        self.fig.canvas.blit = self.profiler.timed(self.fig.canvas.blit, 'draw')
+
+        if self.timeline_path:
+            self.fig.canvas.mpl_connect('close_event', lambda event: self.profiler.export(self.timeline_path))
+
+    def fit_slider(self):
+        """Fit the timeline slider to the current trace, disabling it while the trace is empty."""
+        last = max(0, len(self.arr_states) - 1)
+        self.slider.valmax = last
+        self.slider.ax.set_xlim(self.slider.valmin, max(1, last))  # The axes needs a nonzero width
+        self.slider.set_active(len(self.arr_states) > 0)
+        self.slider.eventson = False
+        self.slider.set_val(0)
+        self.slider.eventson = True
+
+    def create_animation(self):
+        """Create the animation for the sorting process."""
+        if self.playback == 'trace':
+            self.event_markers = EventMarkers(self.ax, color='black')
+
+        if self.profiler is not None:
+            self.instrument_drawing()  # Before the animation, since blitting draws a first frame
+
+        self.ani = self.new_animation()
+
         # Creating a "Reset" button
         ax_button = plt.axes([0.8, 0.9, 0.1, 0.05])  # Position [left, bottom, width, height]
         button = Button(ax_button, 'Reset', color='white', hovercolor='lightgray')
         button.label.set_color('black')  # Text color
         button.on_clicked(self.restart_animation)
 
+        if self.playback == 'trace':
+            # Creating a timeline slider for seeking through the trace, even an empty one a Reset may fill
+            self.fig.subplots_adjust(bottom=0.2)
+            ax_slider = plt.axes([0.15, 0.04, 0.7, 0.03])
+            self.slider = Slider(ax_slider, 'Frame', 0, 1, valinit=0, valstep=1, color='cyan')
+            self.slider.on_changed(self.seek)
+            self.fit_slider()
+
         plt.show()
 
     def restart_animation(self, event):
-        """Restart the animation when the button is clicked."""
-        self.unordered_list = self.generate_random_list()
-        self.arr_states = list(self.selection_sort(self.unordered_list.copy()))
+        """Restart the animation with the input precomputed in the background."""
+        self.ani.pause()
 
-        # Restarting the animation with the new list
-        self.ani = animation.FuncAnimation(
-            self.fig,
-            self.update_plot,
-            frames=len(self.arr_states),
-            interval=500,
-            repeat=False
-        )
+        if self.playback == 'stream':
+            self.arr_states.close()  # Stopping the old producer thread
+
+        # Waiting only if the background thread has not finished yet
+        self.unordered_list, self.arr_states = self.next_states.result()
+        self.next_states = run_in_background(self.prepare_states)
+        self.frame_position = 0
+
+        if self.slider is not None:
+            self.fit_slider()
+
+        self.renderer.update(self.unordered_list, -1, -1)
+
+        if self.event_markers is not None:
+            self.event_markers.reset()
+
+        # The same animation and timer carry on with a fresh frame sequence
+        self.ani.frame_seq = self.ani.new_frame_seq()
+        self.ani.resume()
 
-        plt.draw()  # Update the figure
+        self.fig.canvas.draw_idle()
 
 class SortingVisualizerDarkMode:
 
-    def __init__(self, array_size=15, value_range=(1, 100), algorithm='selection_sort'):
-        """Initialize the sorting visualizer with a given array size and value range."""
+    def __init__(self, array_size=15, value_range=(1, 100), algorithm='selection_sort', playback='snapshot', blit=False, interval=500, shape='uniform', seed=None, cache=True, fps=None, duration=None, profile=False, timeline_path=None, cprofile_path=None):
+        """Initialize the sorting visualizer with a given array size and value range.
+
+        `playback` selects how states are stored: 'snapshot' keeps a copy of the
+        array per frame, 'trace' keeps a keyframed operation trace that a
+        timeline slider can seek and 'stream' pulls frames from a prefetching
+        background thread as it plays. With `blit` only the bars are redrawn
+        over a cached background each tick, which allows a much shorter
+        `interval` (in milliseconds) on large arrays. `shape` names an
+        `input_generators` producer and `seed` makes the inputs reproducible,
+        Reset included. With `cache`, trace playback stores traces in a
+        `TraceCache` and replays a previously seen input without sorting it.
+        Giving `fps` (which replaces `interval`) or a target `duration` in
+        seconds decimates playback: only every k-th state is drawn, with k
+        adapted to the measured draw time so playback keeps that pace.
+        A `duration` needs the number of states up front, so it is rejected
+        for 'stream' playback, whose length is unknown until the sort ends.
+        With `profile`, every frame's generator step, `update_plot` call and
+        canvas draw are timed and their rolling p50/p95/p99 shown in an
+        overlay; the per-frame timeline is written to `timeline_path` as JSON
+        when the window closes. `cprofile_path` receives cProfile stats of
+        one extra run of the algorithm on the first input.
+        """
+        if duration and playback == 'stream':
+            raise ValueError("A target duration is not supported with 'stream' playback, whose frame count is unknown.")
+
         self.array_size = array_size
         self.value_range = value_range
         self.algorithm = algorithm
-        self.unordered_list = self.generate_random_list()
+        self.playback = playback
+        self.blit = blit
+        self.interval = 1000 / fps if fps else interval
+        self.fps = fps
+        self.duration = duration
+        self.shape = shape
+        self.rng = np.random.default_rng(seed)  # Shared by every Reset, so a seeded session replays identically
+        self.trace_cache = TraceCache() if cache and playback == 'trace' else None
+        self.unordered_list = self.generate_input()
+        self.profiler = FrameProfiler() if profile or timeline_path else None
+        self.timeline_path = timeline_path
         # self.arr_states = list(self.selection_sort(self.unordered_list.copy()))
         self.algorithms = SortingAlgorithms()  # Create an instance of SortingAlgorithms
-        self.arr_states = list(self.execute_sorting_algorithm(self.unordered_list.copy()))
-        self.fig, self.ax, self.bars = self.initial_plot(self.unordered_list)
+
+        if cprofile_path:
+            profile_run(self.execute_sorting_algorithm(self.unordered_list.copy()), cprofile_path)
+
+        self.arr_states = self.build_arr_states(self.unordered_list.copy())
+        self.fig, self.ax, self.renderer = self.initial_plot(self.unordered_list)
         self.ani = None
+        self.slider = None
+        self.event_markers = None  # Run and merge bounds, for trace playback
+        self.frame_position = 0  # Next frame index for seekable playback
+        self.next_states = run_in_background(self.prepare_states)  # Ready before Reset is clicked
         self.create_animation()
 
-    def generate_random_list(self):
-        """Generate a random list of integers."""
+    def generate_input(self):
+        """Generate the list of integers to sort."""
 
-        return [random.randint(self.value_range[0], self.value_range[1]) for _ in range(self.array_size)]
+        return generate(self.shape, self.array_size, self.value_range, seed=self.rng).tolist()
 
     def execute_sorting_algorithm(self, arr):
         """Execute the sorting algorithm specified and yield states for visualization."""
@@ -155,6 +409,26 @@ class SortingVisualizerDarkMode:
             return sorting_method(arr)  # Return generator for the selected sorting algorithm
         else:
             raise ValueError(f"Sorting algorithm '{self.algorithm}' is not defined.")
+
+    def prepare_states(self):
+        """Generate the next input and its frame source; runs on a background thread."""
+        arr = self.generate_input()
+
+        return arr, self.build_arr_states(arr.copy())
+
+    def build_arr_states(self, arr):
+        """Build the indexable frame source for the configured playback mode."""
+        if self.playback == 'snapshot':
+            return list(self.execute_sorting_algorithm(arr))
+        elif self.playback == 'trace':
+            if self.trace_cache is not None:
+                return self.trace_cache.replayer(self.algorithm, arr)
+
+            return TraceReplayer(self.algorithms.trace(self.algorithm, arr))
+        elif self.playback == 'stream':
+            return PrefetchedFrameStream(self.execute_sorting_algorithm(arr))
+        else:
+            raise ValueError(f"Playback mode '{self.playback}' is not defined.")
         
     # def selection_sort(self, arr):
     #     """Selection Sort Algorithm with animation yields."""
@@ -185,9 +459,8 @@ class SortingVisualizerDarkMode:
         ax.set_xlim(-0.5, len(arr) - 0.5)  # Centering the bars
         ax.set_ylim(0, max(arr) + 10)
 
-        # Creating bars with initial array values
-        bar_positions = range(len(arr))
-        bars = ax.bar(bar_positions, arr, color="cyan") 
+        # Creating bars (binned per pixel column for wide arrays) as a single collection
+        renderer = create_renderer(ax, arr, color="cyan", current_color="white", min_color="green")
         ax.tick_params(colors="white")
 
         # Creating custom legend handles
@@ -197,50 +470,193 @@ class SortingVisualizerDarkMode:
         ]
         ax.legend(handles=legend_handles, loc="upper left", facecolor="gray", framealpha=0.8)
 
-        return fig, ax, bars
+        return fig, ax, renderer
 
     def update_plot(self, frame):
         """Update the plot with the current state."""
-        arr_data, current_index, min_index = self.arr_states[frame]
+        if isinstance(frame, tuple):
+            # Streamed playback (and the final idle frame) hands over the frame itself
+            arr_data, current_index, min_index = frame
+            changed = None
+        else:
+            arr_data, current_index, min_index = self.arr_states[frame]
+            # Trace playback knows which positions changed; snapshots are diffed
+            changed = self.arr_states.dirty if self.playback == 'trace' else None
+
+            if self.slider is not None and not self.blit:
+                # Moving the slider to follow playback must not trigger a seek
+                self.slider.eventson = False
+                self.slider.set_val(frame)
+                self.slider.eventson = True
+
+            if self.event_markers is not None:
+                events = self.event_markers.update(self.arr_states.trace, frame)
+
+                return self.renderer.update(arr_data, current_index, min_index, changed) + events
+
+        return self.renderer.update(arr_data, current_index, min_index, changed)
+
+    def profiled_update(self, frame):
+        """Time `update_plot` for the profiler and refresh the overlay with the percentiles."""
+        with self.profiler.measure('update'):
+            artists = self.update_plot(frame)
+
+        self.overlay.set_text(self.profiler.summary())
+
+        return [*artists, self.overlay]
+
+    def frame_indices(self):
+        """Yield frame indices from the current timeline position onwards."""
+        while self.frame_position < len(self.arr_states):
+            yield self.frame_position
+            self.frame_position += 1
+
+    def seek(self, value):
+        """Jump the animation to the frame selected on the timeline slider."""
+        if len(self.arr_states) == 0:
+            return  # Nothing to seek in, e.g. an already sorted input
+
+        self.frame_position = min(int(value), len(self.arr_states) - 1)  # set_val does not clamp
+        self.update_plot(self.frame_position)
+        self.fig.canvas.draw_idle()
+
+    def frame_source(self):
+        """Yield the frames of the current states, then idle on the final state.
+
+        The animation is never told that the frames ran out, since it would
+        then drop its timer; playback pauses itself instead, and Reset
+        resumes the same animation with a new frame sequence.
+        """
+        if self.playback == 'stream':
+            frames = self.arr_states  # Frames are pulled from the prefetch queue
+        elif self.playback == 'trace':
+            frames = self.frame_indices()  # Indices follow the timeline slider
+        else:
+            frames = range(len(self.arr_states))
 
-        for i, (bar, val) in enumerate(zip(self.bars, arr_data)):
-            # Set bar colors based on current index and min index
-            bar.set_color("white" if i == current_index else "green" if i == min_index else "cyan")
-            bar.set_height(val)
-        
-        return self.bars
+        if self.fps or self.duration:
+            # Skipped trace indices are still replayed by the next seek, and a
+            # streamed frame is a full state, so no operation is ever lost
+            total = None if self.playback == 'stream' else len(self.arr_states)
+            frames = decimate(frames, FrameDecimator(1000 / self.interval, total, self.duration))
 
-    def create_animation(self):
-        """Create the animation for the sorting process."""
-        self.ani = animation.FuncAnimation(
+        if self.profiler is not None:
+            frames = self.profiler.timed_frames(frames)  # Decimation skips count towards the step
+
+        yield from frames
+
+        while True:
+            self.finish_playback()
+
+            yield self.renderer.heights, -1, -1  # The final state, without highlights
+
+    def finish_playback(self):
+        """Stop the timer and leave the final state drawn normally until the next Reset."""
+        if self.ani is None:
+            return  # Blitting draws a first frame while the animation is being created
+
+        # Pausing also un-animates blitted bars, so full redraws (resizing,
+        # seeking) keep showing them
+        self.ani.pause()
+
+        if self.slider is not None:
+            self.slider.eventson = False
+            self.slider.set_val(max(0, len(self.arr_states) - 1))
+            self.slider.eventson = True
+
+        self.fig.canvas.draw_idle()
+
+    def new_animation(self):
+        """Create the one FuncAnimation that plays every frame source, Reset included."""
+
+        return animation.FuncAnimation(
             self.fig,
-            self.update_plot,
-            frames=len(self.arr_states),
-            interval=500,
-            repeat=False
+            self.update_plot if self.profiler is None else self.profiled_update,
+            frames=self.frame_source,
+            interval=self.interval,
+            repeat=False,
+            blit=self.blit,
+            cache_frame_data=False
+        )
+
+    def instrument_drawing(self):
+        """Add the performance overlay and time every canvas draw for the profiler."""
+        self.overlay = self.ax.text(
+            0.99, 0.98, self.profiler.summary(), transform=self.ax.transAxes, ha='right', va='top',
+            family='monospace', fontsize=8, color='white', bbox=dict(facecolor='black', alpha=0.7, edgecolor='none')
         )
 
+        # Full redraws go through Figure.draw; blitted frames restore the
+        # background, draw the animated artists on the axes and blit them
+        self.fig.draw = self.profiler.timed(self.fig.draw, 'draw')
+        self.ax.draw_artist = self.profiler.timed(self.ax.draw_artist, 'draw')
+        self.fig.canvas.restore_region = self.profiler.timed(self.fig.canvas.restore_region, 'draw')
+        self.fig.canvas.blit = self.profiler.timed(self.fig.canvas.blit, 'draw')
+
+        if self.timeline_path:
+            self.fig.canvas.mpl_connect('close_event', lambda event: self.profiler.export(self.timeline_path))
+
+    def fit_slider(self):
+        """Fit the timeline slider to the current trace, disabling it while the trace is empty."""
+        last = max(0, len(self.arr_states) - 1)
+        self.slider.valmax = last
+        self.slider.ax.set_xlim(self.slider.valmin, max(1, last))  # The axes needs a nonzero width
+        self.slider.set_active(len(self.arr_states) > 0)
+        self.slider.eventson = False
+        self.slider.set_val(0)
+        self.slider.eventson = True
+
+    def create_animation(self):
+        """Create the animation for the sorting process."""
+        if self.playback == 'trace':
+            self.event_markers = EventMarkers(self.ax, color='white')
+
+        if self.profiler is not None:
+            self.instrument_drawing()  # Before the animation, since blitting draws a first frame
+
+        self.ani = self.new_animation()
+
         # Creating a "Reset" button
         ax_button = plt.axes([0.8, 0.9, 0.1, 0.05])  # Position [left, bottom, width, height]
         button = Button(ax_button, 'Reset', color='gray', hovercolor='lightgray')
         button.label.set_color('white')  # Text color
         button.on_clicked(self.restart_animation)
 
+        if self.playback == 'trace':
+            # Creating a timeline slider for seeking through the trace, even an empty one a Reset may fill
+            self.fig.subplots_adjust(bottom=0.2)
+            ax_slider = plt.axes([0.15, 0.04, 0.7, 0.03], facecolor='gray')
+            self.slider = Slider(ax_slider, 'Frame', 0, 1, valinit=0, valstep=1, color='cyan')
+            self.slider.label.set_color('white')
+            self.slider.valtext.set_color('white')
+            self.slider.on_changed(self.seek)
+            self.fit_slider()
+
         plt.show()
 
     def restart_animation(self, event):
-        """Restart the animation when the button is clicked."""
-        self.unordered_list = self.generate_random_list()
-        self.arr_states = list(self.selection_sort(self.unordered_list.copy()))
+        """Restart the animation with the input precomputed in the background."""
+        self.ani.pause()
 
-        # Restarting the animation with the new list
-        self.ani = animation.FuncAnimation(
-            self.fig,
-            self.update_plot,
-            frames=len(self.arr_states),
-            interval=500,
-            repeat=False
-        )
+        if self.playback == 'stream':
+            self.arr_states.close()  # Stopping the old producer thread
+
+        # Waiting only if the background thread has not finished yet
+        self.unordered_list, self.arr_states = self.next_states.result()
+        self.next_states = run_in_background(self.prepare_states)
+        self.frame_position = 0
+
+        if self.slider is not None:
+            self.fit_slider()
+
+        self.renderer.update(self.unordered_list, -1, -1)
+
+        if self.event_markers is not None:
+            self.event_markers.reset()
+
+        # The same animation and timer carry on with a fresh frame sequence
+        self.ani.frame_seq = self.ani.new_frame_seq()
+        self.ani.resume()
 
-        plt.draw()  # Update the figure
+        self.fig.canvas.draw_idle()
     
@@ -1,202 +1,1029 @@
+import heapq
+import os
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from sorting_trace import MetricsRecorder, OperationTrace, Recorder, SnapshotRecorder, copy_array
+
+
+class MergePassView:
+    """Read-only view of the array during a merge pass.
+
+    Positions before `boundary` have already been merged into `dst`; the
+    rest still live in `src`. Recorders copy or read it like the array itself.
+    """
+
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+        self.boundary = 0
+
+    def __len__(self):
+        return len(self.src)
+
+    def __getitem__(self, k):
+        return self.dst[k] if k < self.boundary else self.src[k]
+
+    def __array__(self, dtype=None, copy=None):
+        merged = np.concatenate((np.asarray(self.dst[:self.boundary]), np.asarray(self.src[self.boundary:])))
+
+        return merged if dtype is None else merged.astype(dtype, copy=False)
+
+    def take(self, positions):
+        """Return the values at the ascending `positions` of NumPy-backed buffers, reading only those."""
+        cut = np.searchsorted(positions, self.boundary)
+
+        return np.concatenate((np.asarray(self.dst[positions[:cut]]), np.asarray(self.src[positions[cut:]])))
+
+    def copy(self):
+        """Return the current state as the same kind of buffer as the input."""
+        head, tail = self.dst[:self.boundary], self.src[self.boundary:]
+
+        if isinstance(head, (list, array)) and type(head) is type(tail):
+            return head + tail
+
+        return np.array(self, dtype=np.asarray(tail).dtype)
+
+
+def sort_unrecorded(values, algorithm):
+    """Sort a NumPy array with the named `SortingAlgorithms` method, recording nothing.
+
+    The values are sorted as a plain list, which indexes much faster than a
+    NumPy array, and returned as a new array of the same dtype.
+    """
+    items = values.tolist()
+
+    for _ in getattr(SortingAlgorithms(recorder=Recorder()), algorithm)(items):
+        pass
+
+    return np.array(items, dtype=values.dtype)
+
+
+def sort_shared_chunk(task):
+    """Sort one chunk of a shared-memory array in place inside a worker process."""
+    name, dtype, n, lo, hi, algorithm = task
+    shm = shared_memory.SharedMemory(name=name)
+
+    try:
+        shared = np.ndarray((n,), dtype=dtype, buffer=shm.buf)
+        shared[lo:hi] = sort_unrecorded(shared[lo:hi], algorithm)
+        del shared  # The buffer cannot be closed while a view of it exists
+    finally:
+        shm.close()
+
+    return lo, hi
+
+
 class SortingAlgorithms:
-    """Class encapsulating various sorting algorithms for visualization."""
+    """Class encapsulating various sorting algorithms for visualization.
+
+    Every algorithm sorts `arr` in place and accepts a list, an `array.array`,
+    a NumPy integer array or any writable memoryview.
+    """
+
+    def __init__(self, recorder=None):
+        """Initialize with a recorder deciding what each yielded frame contains."""
+        self.recorder = recorder if recorder is not None else SnapshotRecorder()
+
+    def trace(self, algorithm, arr, record_compares=True):
+        """Run the named algorithm on `arr` and return its `OperationTrace`."""
+        trace = OperationTrace(arr, record_compares=record_compares)
+        sorting_method = getattr(SortingAlgorithms(recorder=trace), algorithm, None)
+
+        if sorting_method is None:
+            raise ValueError(f"Sorting algorithm '{algorithm}' is not defined.")
+
+        for _ in sorting_method(arr):
+            pass
+
+        return trace
+
+    def measure(self, algorithm, arr):
+        """Run the named algorithm on `arr` in counters-only mode and return its `MetricsRecorder`."""
+        metrics = MetricsRecorder()
+        sorting_method = getattr(SortingAlgorithms(recorder=metrics), algorithm, None)
+
+        if sorting_method is None:
+            raise ValueError(f"Sorting algorithm '{algorithm}' is not defined.")
+
+        for _ in sorting_method(arr):
+            pass
+
+        return metrics
     
     def bubble_sort(self, arr):
         """Bubble Sort Algorithm with visualization yields."""
+        rec = self.recorder
         n = len(arr)
         
         for i in range(n):
         
             for j in range(0, n - i - 1):
         
+                rec.compare(j, j + 1)
+
                 if arr[j] > arr[j + 1]:
                     arr[j], arr[j + 1] = arr[j + 1], arr[j]  # Swapping
+                    rec.swap(j, j + 1)
         
-                yield arr.copy(), j, j + 1  # Yield the current state of the array
+                yield rec.frame(arr, j, j + 1)  # Yield the current state of the array
 
     def selection_sort(self, arr):
         """Selection Sort Algorithm with visualization yields."""
+        rec = self.recorder
         n = len(arr)
         
         for i in range(n):
             min_index = i
         
             for j in range(i + 1, n):
+                rec.compare(j, min_index)
         
                 if arr[j] < arr[min_index]:
                     min_index = j
             arr[i], arr[min_index] = arr[min_index], arr[i]  # Swapping
+            rec.swap(i, min_index)
         
-            yield arr.copy(), i, min_index  # Yield the current state of the array
+            yield rec.frame(arr, i, min_index)  # Yield the current state of the array
 
     def insertion_sort(self, arr):
         """Insertion Sort Algorithm with visualization yields."""
+
+        yield from self._insertion_sort_range(arr, 0, len(arr))
+
+    def _insertion_sort_range(self, arr, lo, hi):
+        """Insertion sort of arr[lo:hi], yielding one frame per inserted element."""
+        rec = self.recorder
         
-        for i in range(1, len(arr)):
+        for i in range(lo + 1, hi):
             key = arr[i]
             j = i - 1
         
-            while j >= 0 and key < arr[j]:
+            while j >= lo:
+                rec.compare(j + 1, j)
+
+                if not key < arr[j]:
+                    break
                 arr[j + 1] = arr[j]
+                rec.write(j + 1, arr[j])
                 j -= 1
             arr[j + 1] = key
+            rec.write(j + 1, key)
         
-            yield arr.copy(), i, j + 1  # Yield the current state of the array
+            yield rec.frame(arr, i, j + 1)  # Yield the current state of the array
 
-    def merge_sort(self, arr):
-        """Merge Sort Algorithm with visualization yields."""
+    def merge_sort(self, arr, natural=False):
+        """Merge Sort Algorithm (bottom-up) with visualization yields.
+
+        Runs are merged pass by pass between `arr` and one scratch buffer
+        allocated once, alternating source and destination, so no pass
+        copies data back. With `natural`, the initial runs are the
+        non-decreasing runs already present in the input, so sorted input
+        finishes after the detection pass.
+        """
+        rec = self.recorder
+        n = len(arr)
         
-        if len(arr) > 1:
-            mid = len(arr) // 2
-            left_half = arr[:mid]
-            right_half = arr[mid:]
+        if n < 2:
+            return
+
+        if natural:
+            starts = [0] + [k for k in range(1, n) if self._less(arr, k, k - 1)]
+        else:
+            starts = list(range(n))
+
+        if len(starts) == 1:
+            return  # A single natural run is already sorted
 
-            yield from self.merge_sort(left_half)
-            yield from self.merge_sort(right_half)
+        scratch = copy_array(arr)
+        rec.allocate(n)
+        src, dst = arr, scratch
 
-            i = j = k = 0
+        while len(starts) > 1:
+            bounds = starts + [n]
+            view = MergePassView(src, dst)  # What the array looks like halfway through the pass
+
+            for r in range(0, len(starts), 2):
+                lo, mid = bounds[r], bounds[r + 1]
+                hi = bounds[r + 2] if r + 2 < len(bounds) else mid
+                i, j = lo, mid
         
-            while i < len(left_half) and j < len(right_half):
+                for k in range(lo, hi):
+                    # Taking from the right run only when strictly smaller keeps the sort stable
+                    if i < mid and (j >= hi or not self._less(src, j, i)):
+                        dst[k] = src[i]
+                        i += 1
+                    else:
+                        dst[k] = src[j]
+                        j += 1
+                    rec.write(k, dst[k])
+                    view.boundary = k + 1
         
-                if left_half[i] < right_half[j]:
-                    arr[k] = left_half[i]
-                    i += 1
-                else:
-                    arr[k] = right_half[j]
-                    j += 1
-                k += 1
+                    yield rec.frame(view, k, -1)  # Yield the current state of the array
+
+            starts = starts[::2]
+            src, dst = dst, src
+
+        if src is not arr:
+            # The sorted data ended up in the scratch buffer; the logical array is already sorted
+            for k in range(n):
+                arr[k] = src[k]
+
+    def quick_sort(self, arr, insertion_cutoff=16):
+        """Quick Sort Algorithm (in-place introsort) with visualization yields.
+
+        Ranges are partitioned three ways around a median-of-three pivot
+        (a ninther on large ranges), ranges of `insertion_cutoff` elements or
+        fewer are finished with insertion sort, and heap sort takes over once
+        the recursion gets deeper than 2 * log2(n).
+        """
+        n = len(arr)
         
-                yield arr.copy(), k, -1  # Yield the current state of the array
+        if n > 1:
+            yield from self._introsort(arr, 0, n, 2 * n.bit_length(), insertion_cutoff)
+
+    def _introsort(self, arr, lo, hi, depth_limit, insertion_cutoff):
+        """Sort arr[lo:hi] in place, recursing into the smaller partition only."""
+        rec = self.recorder
+        rec.enter()
+
+        while hi - lo > insertion_cutoff:
+            if depth_limit == 0:
+                yield from self._heap_sort_range(arr, lo, hi)
+                rec.leave()
+
+                return
+
+            depth_limit -= 1
+            pivot_index = self._choose_pivot(arr, lo, hi)
+            lt, gt = yield from self._partition_three_way(arr, lo, hi, pivot_index)
+
+            # Looping on the larger side keeps the recursion depth at O(log n)
+            if lt - lo < hi - gt:
+                yield from self._introsort(arr, lo, lt, depth_limit, insertion_cutoff)
+                lo = gt
+            else:
+                yield from self._introsort(arr, gt, hi, depth_limit, insertion_cutoff)
+                hi = lt
+
+        yield from self._insertion_sort_range(arr, lo, hi)
+        rec.leave()
+
+    def _less(self, arr, i, j):
+        """Compare arr[i] < arr[j], recording the comparison."""
+        self.recorder.compare(i, j)
+
+        return arr[i] < arr[j]
+
+    def _median_of_three(self, arr, a, b, c):
+        """Return whichever of the indices a, b, c holds the median value."""
+        if self._less(arr, a, b):
+            if self._less(arr, b, c):
+                return b
+
+            return c if self._less(arr, a, c) else a
+
+        if self._less(arr, a, c):
+            return a
 
-            while i < len(left_half):
-                arr[k] = left_half[i]
+        return c if self._less(arr, b, c) else b
+
+    def _choose_pivot(self, arr, lo, hi):
+        """Pick a pivot index: median of three, or Tukey's ninther for ranges over 128."""
+        last = hi - 1
+        mid = (lo + last) // 2
+
+        if hi - lo > 128:
+            step = (hi - lo) // 8
+            lo = self._median_of_three(arr, lo, lo + step, lo + 2 * step)
+            mid = self._median_of_three(arr, mid - step, mid, mid + step)
+            last = self._median_of_three(arr, last - 2 * step, last - step, last)
+
+        return self._median_of_three(arr, lo, mid, last)
+
+    def _partition_three_way(self, arr, lo, hi, pivot_index):
+        """Dijkstra partition of arr[lo:hi] into < pivot, == pivot and > pivot.
+
+        Returns `(lt, gt)` such that arr[lt:gt] holds every element equal to
+        the pivot, so runs of duplicates are never partitioned again.
+        """
+        rec = self.recorder
+
+        arr[lo], arr[pivot_index] = arr[pivot_index], arr[lo]  # Moving the pivot to the front
+        rec.swap(lo, pivot_index)
+
+        pivot = arr[lo]
+        lt, i, gt = lo, lo + 1, hi - 1
+
+        while i <= gt:
+            rec.compare(i, lt)  # arr[lt] always holds a copy of the pivot
+
+            if arr[i] < pivot:
+                arr[lt], arr[i] = arr[i], arr[lt]
+                rec.swap(lt, i)
+                lt += 1
                 i += 1
-                k += 1
-        
-                yield arr.copy(), k, -1  # Yield the current state of the array
+            else:
+                rec.compare(lt, i)
 
-            while j < len(right_half):
-                arr[k] = right_half[j]
-                j += 1
-                k += 1
-        
-                yield arr.copy(), k, -1  # Yield the current state of the array
+                if pivot < arr[i]:
+                    arr[i], arr[gt] = arr[gt], arr[i]
+                    rec.swap(i, gt)
+                    gt -= 1
+                else:
+                    i += 1
 
-    def quick_sort(self, arr):
-        """Quick Sort Algorithm with visualization yields."""
-        
-        if len(arr) <= 1:
-            yield arr.copy(), -1, -1  # Base case yields
-        
-            return arr
-        
-        pivot = arr[len(arr) // 2]
-        left = [x for x in arr if x < pivot]
-        middle = [x for x in arr if x == pivot]
-        right = [x for x in arr if x > pivot]
-        
-        yield from self.quick_sort(left)
-        yield middle, -1, -1  # Yield current pivot position
-        yield from self.quick_sort(right)
+                    continue
 
-    def heap_sort(self, arr):
-        """Heap Sort Algorithm with visualization yields."""
-        
-        def heapify(arr, n, i):
-            largest = i
-            left = 2 * i + 1
-            right = 2 * i + 2
+            yield rec.frame(arr, i, lt)  # Yield the current state of the array
 
-            if left < n and arr[left] > arr[largest]:
-                largest = left
-            if right < n and arr[right] > arr[largest]:
-                largest = right
-            if largest != i:
-                arr[i], arr[largest] = arr[largest], arr[i]  # Swapping
-        
-                yield from heapify(arr, n, largest)
+        return lt, gt + 1
+
+    def heap_sort(self, arr, bottom_up=False):
+        """Heap Sort Algorithm with visualization yields.
+
+        Sift-downs are iterative and yield a frame per swap. With `bottom_up`,
+        Floyd's variant walks down to a leaf along the larger children and
+        climbs back to the insertion point, which needs about half the
+        comparisons on the large sift-downs that dominate the sort phase.
+        """
+
+        yield from self._heap_sort_range(arr, 0, len(arr), bottom_up)
+
+    def _heap_sort_range(self, arr, lo, hi, bottom_up=False):
+        """Heap sort of arr[lo:hi] with an iterative sift-down, yielding a frame per swap."""
+        rec = self.recorder
+        sift_down = self._sift_down_bottom_up if bottom_up else self._sift_down
+        n = hi - lo
+
+        for root in range(n // 2 - 1, -1, -1):
+            yield from sift_down(arr, lo, root, n)
+
+        for end in range(n - 1, 0, -1):
+            arr[lo], arr[lo + end] = arr[lo + end], arr[lo]  # Moving the maximum behind the heap
+            rec.swap(lo, lo + end)
+
+            yield rec.frame(arr, lo + end, lo)
+            yield from sift_down(arr, lo, 0, end)
+
+    def _sift_down(self, arr, lo, root, end):
+        """Sift the heap node `root` down a max-heap of `end` nodes stored from arr[lo]."""
+        rec = self.recorder
+
+        while True:
+            child = 2 * root + 1
+
+            if child >= end:
+                return
+
+            if child + 1 < end and self._less(arr, lo + child, lo + child + 1):
+                child += 1
+
+            if not self._less(arr, lo + root, lo + child):
+                return
+
+            arr[lo + root], arr[lo + child] = arr[lo + child], arr[lo + root]  # Swapping
+            rec.swap(lo + root, lo + child)
 
+            yield rec.frame(arr, lo + child, lo + root)
+
+            root = child
+
+    def _sift_down_bottom_up(self, arr, lo, root, end):
+        """Floyd's sift-down: find the leaf on the larger-child path, then climb back up."""
+        rec = self.recorder
+        leaf = root
+
+        while 2 * leaf + 1 < end:
+            child = 2 * leaf + 1
+
+            if child + 1 < end and self._less(arr, lo + child, lo + child + 1):
+                child += 1
+            leaf = child
+
+        # Climbing back to the first node on the path not smaller than the root value
+        while leaf > root and self._less(arr, lo + leaf, lo + root):
+            leaf = (leaf - 1) // 2
+
+        if leaf == root:
+            return
+
+        # Rotating the path: the root value drops to `leaf`, the nodes above it move up one level
+        key = arr[lo + root]
+
+        while leaf > root:
+            arr[lo + leaf], key = key, arr[lo + leaf]
+            rec.write(lo + leaf, arr[lo + leaf])
+
+            yield rec.frame(arr, lo + leaf, lo + root)
+
+            leaf = (leaf - 1) // 2
+
+        arr[lo + root] = key
+        rec.write(lo + root, key)
+
+        yield rec.frame(arr, lo + root, -1)
+
+    def counting_sort(self, arr, sparse_factor=4):
+        """Counting Sort Algorithm with visualization yields.
+
+        Counts are offset by `min(arr)`, so negative values work and the
+        count array only spans the actual value range. When that range is
+        more than `sparse_factor` times the input length, only the distinct
+        values are counted and their keys are sorted instead.
+        """
+        rec = self.recorder
         n = len(arr)
-        for i in range(n // 2 - 1, -1, -1):
-            yield from heapify(arr, n, i)
 
-        for i in range(n - 1, 0, -1):
-            arr[i], arr[0] = arr[0], arr[i]  # Swapping
-        
-            yield from heapify(arr, i, 0)
+        if n == 0:
+            return
+
+        min_val, max_val = int(min(arr)), int(max(arr))
+        span = max_val - min_val + 1
 
-    def counting_sort(self, arr):
-        """Counting Sort Algorithm with visualization yields."""
-        max_val = max(arr)
-        count = [0] * (max_val + 1)
+        if span <= sparse_factor * n:
+            count = [0] * span
+            rec.allocate(span)
 
-        for num in arr:
-            count[num] += 1
+            for num in arr:
+                count[int(num) - min_val] += 1
+
+            keys = ((min_val + offset, c) for offset, c in enumerate(count) if c)
+        else:
+            # Sparse path: a dictionary of the distinct values instead of a huge count array
+            count = {}
+
+            for num in arr:
+                num = int(num)
+                count[num] = count.get(num, 0) + 1
+            rec.allocate(len(count))
+
+            keys = ((value, count[value]) for value in sorted(count))
 
         sorted_index = 0
         
-        for i, c in enumerate(count):
+        for value, c in keys:
         
             for _ in range(c):
-                arr[sorted_index] = i
+                arr[sorted_index] = value
+                rec.write(sorted_index, value)
                 sorted_index += 1
         
-                yield arr.copy(), sorted_index - 1, -1  # Yield the current state of the array
+                yield rec.frame(arr, sorted_index - 1, -1)  # Yield the current state of the array
 
-    def radix_sort(self, arr):
-        """Radix Sort Algorithm with visualization yields."""
-        
-        def counting_sort_for_radix(arr, exp):
-            n = len(arr)
-            output = [0] * n
-            count = [0] * 10
+    def radix_sort(self, arr, radix=256):
+        """Radix Sort Algorithm (LSD) with visualization yields.
+
+        Keys are biased by `min(arr)` so signed values sort correctly, and
+        digits are taken in base `radix`: 256 sorts 32-bit keys in at most 4
+        passes and 2**11 in 3, instead of up to 10 decimal passes. Passes
+        whose digit is the same for every key are skipped.
+        """
+        rec = self.recorder
+        n = len(arr)
+
+        if n == 0:
+            return
 
+        min_val = int(min(arr))
+        max_key = int(max(arr)) - min_val
+        output = [0] * n  # Output and digit buffers are reused by every pass
+        digits = [0] * n
+        rec.allocate(2 * n + radix)
+
+        def counting_sort_for_radix(arr, exp):
+            count = [0] * radix
             for i in range(n):
-                index = arr[i] // exp
-                count[index % 10] += 1
+                digits[i] = d = (int(arr[i]) - min_val) // exp % radix
+                count[d] += 1
 
-            for i in range(1, 10):
+            if max(count) == n:
+                return  # Every key has the same digit, so this pass would not move anything
+
+            for i in range(1, radix):
                 count[i] += count[i - 1]
 
             for i in range(n - 1, -1, -1):
-                index = arr[i] // exp
-                output[count[index % 10] - 1] = arr[i]
-                count[index % 10] -= 1
+                count[digits[i]] -= 1
+                output[count[digits[i]]] = arr[i]
 
             for i in range(n):
                 arr[i] = output[i]
+                rec.write(i, output[i])
         
-                yield arr.copy(), i, -1  # Yield the current state of the array
+                yield rec.frame(arr, i, -1)  # Yield the current state of the array
 
-        max_num = max(arr)
         exp = 1
 
-        while max_num // exp > 0:
+        while max_key // exp > 0:
             yield from counting_sort_for_radix(arr, exp)
         
-            exp *= 10
+            exp *= radix
+
+    def bucket_sort(self, arr, bucket_size=8):
+        """Bucket Sort Algorithm with visualization yields.
 
-    def bucket_sort(self, arr):
-        """Bucket Sort Algorithm with visualization yields."""
+        About n / `bucket_size` buckets are bounded by quantiles of an evenly
+        strided sample, so skewed data still spreads evenly. Values are
+        scattered stably into one output buffer, gathered back into `arr`,
+        and each bucket is finished with a traced insertion sort. Buckets
+        that still grow large (e.g. heavy duplicates) are sorted with the
+        introsort instead.
+        """
+        rec = self.recorder
+        n = len(arr)
         
-        if len(arr) == 0:
-            return arr
+        if n < 2:
+            return
+
+        bucket_count = max(1, n // bucket_size)
+
+        # Choosing bucket boundaries from the quantiles of a sample
+        step = max(1, n // (32 * bucket_count))
+        sample = sorted(arr[k] for k in range(0, n, step))
+        splitters = [sample[len(sample) * b // bucket_count] for b in range(1, bucket_count)]
 
-        # Creating buckets
-        max_value = max(arr)
-        bucket_count = len(arr) // 5
-        buckets = [[] for _ in range(bucket_count)]
+        bucket_of = [bisect_right(splitters, arr[k]) for k in range(n)]
+        counts = [0] * (bucket_count + 1)
+        rec.allocate(2 * n + len(sample) + len(counts))
 
-        # Distributing input array values into buckets
-        for num in arr:
-            index = min(num * bucket_count // (max_value + 1), bucket_count - 1)
-            buckets[index].append(num)
+        for b in bucket_of:
+            counts[b + 1] += 1
 
-        # Sorting each bucket and concatenate
-        sorted_arr = []
+        for b in range(bucket_count):
+            counts[b + 1] += counts[b]  # counts[b] is now where bucket b starts
 
-        for bucket in buckets:
-            sorted_arr.extend(sorted(bucket))
+        # Scattering stably into the output buffer, then gathering it back into the array
+        output = [0] * n
+        fill = counts[:-1]
 
-        yield sorted_arr, -1, -1  
+        for k in range(n):
+            output[fill[bucket_of[k]]] = arr[k]
+            fill[bucket_of[k]] += 1
+
+        for k in range(n):
+            arr[k] = output[k]
+            rec.write(k, output[k])
+
+            yield rec.frame(arr, k, -1)  # Yield the current state of the array
+
+        for b in range(bucket_count):
+            lo, hi = counts[b], counts[b + 1]
+
+            if hi - lo <= 4 * bucket_size:
+                yield from self._insertion_sort_range(arr, lo, hi)
+            else:
+                yield from self._introsort(arr, lo, hi, 2 * (hi - lo).bit_length(), 16)
+
+    def tim_sort(self, arr):
+        """Timsort-style adaptive run merging with visualization yields.
+
+        Natural runs are detected (strictly descending ones are reversed) and
+        short runs are extended to `minrun` with binary insertion. Runs are
+        kept on a stack whose lengths satisfy the Timsort invariants, and
+        merges switch to galloping once one side keeps winning, so sorted or
+        reversed input takes O(n) comparisons. Run detection and merge
+        decisions are reported through `recorder.event` and as frames
+        highlighting the two runs being merged. Values copied aside for a
+        merge no longer have a position in the array, so comparisons against
+        them are recorded with -1 for that side.
+        """
+        rec = self.recorder
+        n = len(arr)
+        MIN_GALLOP = 7
+        min_gallop = MIN_GALLOP
+
+        if n < 2:
+            return
+
+        def less(x, y, i, j):
+            """Compare x < y, where i and j are their positions, -1 for a value held in `temp`."""
+            rec.compare(i, j)
+
+            return x < y
+
+        def put(k, value):
+            arr[k] = value
+            rec.write(k, value)
+
+            return rec.frame(arr, k, -1)
+
+        def min_run_length(n):
+            r = 0
+
+            while n >= 64:
+                r |= n & 1
+                n >>= 1
+
+            return n + r
+
+        def count_run(lo):
+            """Return the length of the run starting at lo, reversing it if strictly descending."""
+            hi = lo + 1
+
+            if hi == n:
+                return 1
+
+            if less(arr[hi], arr[lo], hi, lo):
+                while hi + 1 < n and less(arr[hi + 1], arr[hi], hi + 1, hi):
+                    hi += 1
+
+                i, j = lo, hi
+
+                while i < j:
+                    arr[i], arr[j] = arr[j], arr[i]  # Swapping
+                    rec.swap(i, j)
+
+                    yield rec.frame(arr, i, j)
+
+                    i += 1
+                    j -= 1
+            else:
+                while hi + 1 < n and not less(arr[hi + 1], arr[hi], hi + 1, hi):
+                    hi += 1
+
+            return hi + 1 - lo
+
+        def binary_insertion_sort(lo, hi, start):
+            """Extend the sorted run arr[lo:start] to arr[lo:hi] by binary insertion."""
+            for i in range(start, hi):
+                pivot = arr[i]
+                left, right = lo, i
+
+                while left < right:
+                    mid = (left + right) // 2
+
+                    if less(pivot, arr[mid], i, mid):
+                        right = mid
+                    else:
+                        left = mid + 1
+
+                for k in range(i, left, -1):
+                    arr[k] = arr[k - 1]
+                    rec.write(k, arr[k])
+                arr[left] = pivot
+                rec.write(left, pivot)
+
+                yield rec.frame(arr, i, left)
+
+        def position_in(seq, base):
+            """Map offsets from `base` in `seq` to array positions, or to -1 when `seq` is a merge's `temp`."""
+            if seq is arr:
+                return lambda k: base + k
+
+            return lambda k: -1
+
+        def gallop_left(key, key_index, seq, base, length, hint):
+            """Return k such that seq[base + k - 1] < key <= seq[base + k]; `key_index` is the key's position or -1."""
+            at = position_in(seq, base)
+            last, ofs = 0, 1
+
+            if less(seq[base + hint], key, at(hint), key_index):
+                max_ofs = length - hint
+
+                while ofs < max_ofs and less(seq[base + hint + ofs], key, at(hint + ofs), key_index):
+                    last, ofs = ofs, (ofs << 1) + 1
+                last, ofs = last + hint, min(ofs, max_ofs) + hint
+            else:
+                max_ofs = hint + 1
+
+                while ofs < max_ofs and not less(seq[base + hint - ofs], key, at(hint - ofs), key_index):
+                    last, ofs = ofs, (ofs << 1) + 1
+                last, ofs = hint - min(ofs, max_ofs), hint - last
+
+            last += 1
+
+            while last < ofs:
+                m = last + ((ofs - last) >> 1)
+
+                if less(seq[base + m], key, at(m), key_index):
+                    last = m + 1
+                else:
+                    ofs = m
+
+            return ofs
+
+        def gallop_right(key, key_index, seq, base, length, hint):
+            """Return k such that seq[base + k - 1] <= key < seq[base + k]; `key_index` is the key's position or -1."""
+            at = position_in(seq, base)
+            last, ofs = 0, 1
+
+            if less(key, seq[base + hint], key_index, at(hint)):
+                max_ofs = hint + 1
+
+                while ofs < max_ofs and less(key, seq[base + hint - ofs], key_index, at(hint - ofs)):
+                    last, ofs = ofs, (ofs << 1) + 1
+                last, ofs = hint - min(ofs, max_ofs), hint - last
+            else:
+                max_ofs = length - hint
+
+                while ofs < max_ofs and not less(key, seq[base + hint + ofs], key_index, at(hint + ofs)):
+                    last, ofs = ofs, (ofs << 1) + 1
+                last, ofs = last + hint, min(ofs, max_ofs) + hint
+
+            last += 1
+
+            while last < ofs:
+                m = last + ((ofs - last) >> 1)
+
+                if less(key, seq[base + m], key_index, at(m)):
+                    ofs = m
+                else:
+                    last = m + 1
+
+            return ofs
+
+        def merge_lo(base_a, len_a, base_b, len_b):
+            """Merge adjacent runs left to right, with the shorter run A copied aside."""
+            nonlocal min_gallop
+            temp = [arr[k] for k in range(base_a, base_a + len_a)]
+            rec.allocate(len_a)
+            cursor_a, cursor_b, dest = 0, base_b, base_a
+
+            yield put(dest, arr[cursor_b])
+            dest, cursor_b, len_b = dest + 1, cursor_b + 1, len_b - 1
+
+            while len_b > 0 and len_a > 1:
+                count_a = count_b = 0
+
+                # Straight merge until one run wins min_gallop times in a row
+                while len_b > 0 and len_a > 1 and max(count_a, count_b) < min_gallop:
+                    if less(arr[cursor_b], temp[cursor_a], cursor_b, -1):
+                        yield put(dest, arr[cursor_b])
+                        dest, cursor_b, len_b = dest + 1, cursor_b + 1, len_b - 1
+                        count_a, count_b = 0, count_b + 1
+                    else:
+                        yield put(dest, temp[cursor_a])
+                        dest, cursor_a, len_a = dest + 1, cursor_a + 1, len_a - 1
+                        count_a, count_b = count_a + 1, 0
+
+                if len_b == 0 or len_a <= 1:
+                    break
+
+                rec.event('gallop', dest)
+                min_gallop += 1
+
+                while len_b > 0 and len_a > 1:
+                    min_gallop -= min_gallop > 1
+
+                    count_a = gallop_right(arr[cursor_b], cursor_b, temp, cursor_a, len_a, 0)
+
+                    for k in range(count_a):
+                        yield put(dest + k, temp[cursor_a + k])
+                    dest, cursor_a, len_a = dest + count_a, cursor_a + count_a, len_a - count_a
+
+                    if len_a <= 1:
+                        break
+
+                    yield put(dest, arr[cursor_b])
+                    dest, cursor_b, len_b = dest + 1, cursor_b + 1, len_b - 1
+
+                    if len_b == 0:
+                        break
+
+                    count_b = gallop_left(temp[cursor_a], -1, arr, cursor_b, len_b, 0)
+
+                    for k in range(count_b):
+                        yield put(dest + k, arr[cursor_b + k])
+                    dest, cursor_b, len_b = dest + count_b, cursor_b + count_b, len_b - count_b
+
+                    if len_b == 0:
+                        break
+
+                    yield put(dest, temp[cursor_a])
+                    dest, cursor_a, len_a = dest + 1, cursor_a + 1, len_a - 1
+
+                    if len_a <= 1 or (count_a < MIN_GALLOP and count_b < MIN_GALLOP):
+                        break
+
+                min_gallop += 1
+
+            if len_a == 1:
+                # The last element of A goes after whatever is left of B
+                for k in range(len_b):
+                    yield put(dest + k, arr[cursor_b + k])
+                yield put(dest + len_b, temp[cursor_a])
+            else:
+                for k in range(len_a):
+                    yield put(dest + k, temp[cursor_a + k])
+
+        def merge_hi(base_a, len_a, base_b, len_b):
+            """Merge adjacent runs right to left, with the shorter run B copied aside."""
+            nonlocal min_gallop
+            temp = [arr[k] for k in range(base_b, base_b + len_b)]
+            rec.allocate(len_b)
+            cursor_a, cursor_b, dest = base_a + len_a - 1, len_b - 1, base_b + len_b - 1
+
+            yield put(dest, arr[cursor_a])
+            dest, cursor_a, len_a = dest - 1, cursor_a - 1, len_a - 1
+
+            while len_a > 0 and len_b > 1:
+                count_a = count_b = 0
+
+                # Straight merge until one run wins min_gallop times in a row
+                while len_a > 0 and len_b > 1 and max(count_a, count_b) < min_gallop:
+                    if less(temp[cursor_b], arr[cursor_a], -1, cursor_a):
+                        yield put(dest, arr[cursor_a])
+                        dest, cursor_a, len_a = dest - 1, cursor_a - 1, len_a - 1
+                        count_a, count_b = count_a + 1, 0
+                    else:
+                        yield put(dest, temp[cursor_b])
+                        dest, cursor_b, len_b = dest - 1, cursor_b - 1, len_b - 1
+                        count_a, count_b = 0, count_b + 1
+
+                if len_a == 0 or len_b <= 1:
+                    break
+
+                rec.event('gallop', dest)
+                min_gallop += 1
+
+                while len_a > 0 and len_b > 1:
+                    min_gallop -= min_gallop > 1
+
+                    count_a = len_a - gallop_right(temp[cursor_b], -1, arr, base_a, len_a, len_a - 1)
+
+                    for k in range(count_a):
+                        yield put(dest - k, arr[cursor_a - k])
+                    dest, cursor_a, len_a = dest - count_a, cursor_a - count_a, len_a - count_a
+
+                    if len_a == 0:
+                        break
+
+                    yield put(dest, temp[cursor_b])
+                    dest, cursor_b, len_b = dest - 1, cursor_b - 1, len_b - 1
+
+                    if len_b <= 1:
+                        break
+
+                    count_b = len_b - gallop_left(arr[cursor_a], cursor_a, temp, 0, len_b, len_b - 1)
+
+                    for k in range(count_b):
+                        yield put(dest - k, temp[cursor_b - k])
+                    dest, cursor_b, len_b = dest - count_b, cursor_b - count_b, len_b - count_b
+
+                    if len_b <= 1:
+                        break
+
+                    yield put(dest, arr[cursor_a])
+                    dest, cursor_a, len_a = dest - 1, cursor_a - 1, len_a - 1
+
+                    if len_a == 0 or (count_a < MIN_GALLOP and count_b < MIN_GALLOP):
+                        break
+
+                min_gallop += 1
+
+            if len_b == 1:
+                # The first element of B goes before whatever is left of A
+                for k in range(len_a):
+                    yield put(dest - k, arr[cursor_a - k])
+                yield put(dest - len_a, temp[cursor_b])
+            else:
+                for k in range(len_b):
+                    yield put(dest - k, temp[cursor_b - k])
+
+        def merge_at(runs, i):
+            """Merge runs i and i + 1 of the stack."""
+            base_a, len_a = runs[i]
+            base_b, len_b = runs[i + 1]
+            runs[i] = (base_a, len_a + len_b)
+            del runs[i + 1]
+
+            rec.event('merge', base_a, base_b, base_b + len_b)
+
+            yield rec.frame(arr, base_a, base_b)  # Highlighting the two runs being merged
+
+            # Elements of A already before B's first element, and of B after A's last, stay put
+            k = gallop_right(arr[base_b], base_b, arr, base_a, len_a, 0)
+            base_a, len_a = base_a + k, len_a - k
+
+            if len_a == 0:
+                return
+
+            len_b = gallop_left(arr[base_a + len_a - 1], base_a + len_a - 1, arr, base_b, len_b, len_b - 1)
+
+            if len_b == 0:
+                return
+
+            if len_a <= len_b:
+                yield from merge_lo(base_a, len_a, base_b, len_b)
+            else:
+                yield from merge_hi(base_a, len_a, base_b, len_b)
+
+        def merge_collapse(runs):
+            """Merge until the run lengths satisfy A > B + C and B > C from the top of the stack."""
+            while len(runs) > 1:
+                i = len(runs) - 2
+
+                if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                    if runs[i - 1][1] < runs[i + 1][1]:
+                        i -= 1
+                elif runs[i][1] > runs[i + 1][1]:
+                    break
+
+                yield from merge_at(runs, i)
+
+        min_run = min_run_length(n)
+        runs = []  # Stack of (base, length) pending runs
+        lo = 0
+
+        while lo < n:
+            run_length = yield from count_run(lo)
+
+            if run_length < min_run:
+                forced = min(min_run, n - lo)
+
+                yield from binary_insertion_sort(lo, lo + forced, lo + run_length)
+
+                run_length = forced
+
+            rec.event('run', lo, lo + run_length)
+            runs.append((lo, run_length))
+
+            yield from merge_collapse(runs)
+
+            lo += run_length
+
+        while len(runs) > 1:
+            i = len(runs) - 2
+
+            if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+
+            yield from merge_at(runs, i)
+
+    def parallel_sort(self, arr, algorithm='quick_sort', workers=None, chunks=None):
+        """Chunked multi-core sort with a k-way heap merge and visualization yields.
+
+        `arr` is copied once into shared memory and split into `chunks`
+        ranges (one per worker by default); each range is sorted by
+        `algorithm` in a worker process, so only the shared block's name
+        and the chunk bounds are pickled. Sorted chunks are copied back as
+        they finish, with a frame highlighting each chunk's first and last
+        index, then merged with a heap into `arr`, one frame per element.
+        Operations inside the workers are not recorded; the copy-back
+        writes carry their net effect. The `chunk` and `merge` events let
+        trace playback mark the chunk boundaries and the merge progress.
+        """
+        rec = self.recorder
+        n = len(arr)
+
+        if n < 2:
+            return
+
+        # Only the sorts themselves; helpers such as trace or _less would fail inside a worker
+        if not algorithm.endswith('_sort') or not hasattr(SortingAlgorithms, algorithm) or algorithm == 'parallel_sort':
+            raise ValueError(f"Sorting algorithm '{algorithm}' is not defined.")
+
+        chunks = max(1, min(n, chunks or workers or os.cpu_count() or 1))
+        bounds = [n * c // chunks for c in range(chunks + 1)]
+        data = np.asarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=data.nbytes)
+
+        try:
+            shared = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+            shared[:] = data
+            tasks = [(shm.name, data.dtype.str, n, bounds[c], bounds[c + 1], algorithm) for c in range(chunks)]
+
+            for c in range(chunks):
+                rec.event('chunk', bounds[c], bounds[c + 1])
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for future in as_completed([executor.submit(sort_shared_chunk, task) for task in tasks]):
+                    lo, hi = future.result()
+
+                    for k, value in enumerate(shared[lo:hi].tolist(), lo):
+                        arr[k] = value
+                        rec.write(k, value)
+
+                    yield rec.frame(arr, lo, hi - 1)  # Highlighting the chunk that just finished
+
+            if chunks == 1:
+                return
+
+            runs = [shared[bounds[c]:bounds[c + 1]].tolist() for c in range(chunks)]
+            rec.allocate(n)
+            rec.event('merge', 0, n)
+
+            # Ties are broken by chunk number, which keeps the merge stable
+            heap = [(run[0], c, 0) for c, run in enumerate(runs)]
+            heapq.heapify(heap)
+
+            for k in range(n):
+                value, c, i = heap[0]
+                arr[k] = value
+                rec.write(k, value)
+
+                if i + 1 < len(runs[c]):
+                    heapq.heapreplace(heap, (runs[c][i + 1], c, i + 1))
+                else:
+                    heapq.heappop(heap)
 
+                yield rec.frame(arr, k, bounds[c] + i)  # Merged position and where it came from
+        finally:
+            shared = None
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,232 @@
+import argparse
+import csv
+import json
+import sys
+import time
+import tracemalloc
+
+from headless_export import HeadlessRenderer
+from input_generators import PRODUCERS, generate
+from sorting_algorithms import SortingAlgorithms
+
+
+ALGORITHMS = [name for name in vars(SortingAlgorithms) if name.endswith('_sort')]
+SIZES = (10, 100, 1000)
+SHAPES = tuple(PRODUCERS)
+# Sorts whose recorder sees every comparison they make; bucket_sort also
+# compares sample values, outside the array, with the built-in sort and bisect
+COUNTED_SORTS = ('bubble_sort', 'selection_sort', 'insertion_sort', 'merge_sort', 'quick_sort', 'heap_sort', 'tim_sort')
+FIELDS = ('algorithm', 'size', 'shape', 'seconds', 'frames', 'completed', 'trace_peak_bytes', 'render_fps', 'error')
+
+
+def make_input(shape, size, seed=0):
+    """Build a reproducible input list of the given shape."""
+
+    return generate(shape, size, seed=seed).tolist()
+
+
+def time_generator(algorithm, arr, timeout):
+    """Exhaust the algorithm's generator; return seconds, frames and whether it finished."""
+    generator = getattr(SortingAlgorithms(), algorithm)(list(arr))
+    frames = 0
+    start = time.perf_counter()
+
+    for _ in generator:
+        frames += 1
+
+        # Checking the clock only every 1024 frames keeps its cost out of the measurement
+        if frames % 1024 == 0 and time.perf_counter() - start > timeout:
+            return time.perf_counter() - start, frames, False
+
+    return time.perf_counter() - start, frames, True
+
+
+class CountingValue:
+    """Integer wrapper counting every ordering comparison made on it."""
+
+    comparisons = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def _other(self, other):
+        CountingValue.comparisons += 1
+
+        return other.value if isinstance(other, CountingValue) else other
+
+    def __lt__(self, other):
+        return self.value < self._other(other)
+
+    def __le__(self, other):
+        return self.value <= self._other(other)
+
+    def __gt__(self, other):
+        return self.value > self._other(other)
+
+    def __ge__(self, other):
+        return self.value >= self._other(other)
+
+
+def check_comparison_counts(algorithms=COUNTED_SORTS, size=2000, seed=0):
+    """Return (algorithm, recorded, actual) for every sort whose `measure` miscounts comparisons."""
+    arr = make_input('uniform', size, seed)
+    mismatches = []
+
+    for algorithm in algorithms:
+        recorded = SortingAlgorithms().measure(algorithm, list(arr)).comparisons
+        CountingValue.comparisons = 0
+
+        for _ in getattr(SortingAlgorithms(), algorithm)([CountingValue(value) for value in arr]):
+            pass
+
+        if recorded != CountingValue.comparisons:
+            mismatches.append((algorithm, recorded, CountingValue.comparisons))
+
+    return mismatches
+
+
+def measure_trace_memory(algorithm, arr):
+    """Return the peak memory, in bytes, allocated while recording an operation trace."""
+    tracemalloc.start()
+
+    try:
+        SortingAlgorithms().trace(algorithm, list(arr))
+
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_render_fps(algorithm, arr, render_frames):
+    """Render up to `render_frames` frames offscreen and return the frames per second."""
+    renderer = HeadlessRenderer(algorithm, arr)
+    frames = 0
+    start = time.perf_counter()
+
+    for frame in getattr(SortingAlgorithms(), algorithm)(list(arr)):
+        renderer.render(frame)
+        frames += 1
+
+        if frames == render_frames:
+            break
+
+    elapsed = time.perf_counter() - start
+
+    return frames / elapsed if elapsed else 0.0
+
+
+def run_benchmarks(algorithms=ALGORITHMS, sizes=SIZES, shapes=SHAPES, timeout=10.0, render_frames=100, max_render_size=1000, repeats=3, seed=0):
+    """Benchmark every algorithm over the size and shape grid and return one record per run.
+
+    Generator time is the best of `repeats` runs to damp timer noise. Trace
+    memory is only measured for runs that finished within `timeout`, and
+    render throughput only for sizes up to `max_render_size`.
+    """
+    results = []
+
+    for algorithm in algorithms:
+        for size in sizes:
+            for shape in shapes:
+                arr = make_input(shape, size, seed)
+                record = dict.fromkeys(FIELDS)
+                record.update(algorithm=algorithm, size=size, shape=shape)
+
+                try:
+                    record['seconds'], record['frames'], record['completed'] = time_generator(algorithm, arr, timeout)
+
+                    # Repeating a run that already hit the timeout would only multiply the wait
+                    for _ in range(repeats - 1 if record['completed'] else 0):
+                        record['seconds'] = min(record['seconds'], time_generator(algorithm, arr, timeout)[0])
+
+                    if record['completed']:
+                        record['trace_peak_bytes'] = measure_trace_memory(algorithm, arr)
+                    if render_frames and size <= max_render_size:
+                        record['render_fps'] = measure_render_fps(algorithm, arr, render_frames)
+                except Exception as error:  # Broken algorithm/input pairs are reported, not fatal
+                    record['error'] = f"{type(error).__name__}: {error}"
+
+                results.append(record)
+                print(f"{algorithm:>15} n={size:<7} {shape:<13} {record['seconds'] or 0:9.4f}s {record['frames'] or 0:>10} frames {record['error'] or ''}", file=sys.stderr)
+
+    return results
+
+
+def save_results(results, path):
+    """Write results as JSON or CSV depending on the file extension."""
+    with open(path, 'w', newline='') as f:
+        if path.endswith('.csv'):
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    """Read results written by `save_results`."""
+    with open(path, newline='') as f:
+        if not path.endswith('.csv'):
+            return json.load(f)
+
+        results = list(csv.DictReader(f))
+
+    for record in results:
+        record['size'] = int(record['size'])
+
+        for key in ('seconds', 'render_fps'):
+            record[key] = float(record[key]) if record[key] else None
+
+    return results
+
+
+def compare_results(results, baseline, tolerance=0.2):
+    """Return the runs whose generator time or render throughput regressed beyond `tolerance`."""
+    previous = {(r['algorithm'], r['size'], r['shape']): r for r in baseline}
+    regressions = []
+
+    for record in results:
+        old = previous.get((record['algorithm'], record['size'], record['shape']))
+
+        if old is None:
+            continue
+
+        if record['seconds'] and old['seconds'] and record['seconds'] > old['seconds'] * (1 + tolerance):
+            regressions.append((record, 'seconds', old['seconds'], record['seconds']))
+        if record['render_fps'] and old['render_fps'] and record['render_fps'] < old['render_fps'] * (1 - tolerance):
+            regressions.append((record, 'render_fps', old['render_fps'], record['render_fps']))
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SortingAlgorithms generators and the bar renderer.")
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--shapes", nargs="+", default=SHAPES, choices=SHAPES)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds allowed per generator run")
+    parser.add_argument("--repeats", type=int, default=3, help="Generator runs per configuration; the fastest is kept")
+    parser.add_argument("--render-frames", type=int, default=100, help="Frames rendered per run to measure frames/s (0 disables)")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results file (.json or .csv)")
+    parser.add_argument("--baseline", help="Saved results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before flagging a regression")
+    parser.add_argument("--check-counts", action="store_true", help="Only check that recorded comparison counts match the real ones")
+    args = parser.parse_args()
+
+    if args.check_counts:
+        mismatches = check_comparison_counts()
+
+        for algorithm, recorded, actual in mismatches:
+            print(f"MISCOUNT {algorithm}: {recorded} comparisons recorded, {actual} made")
+
+        sys.exit(1 if mismatches else 0)
+
+    results = run_benchmarks(args.algorithms, args.sizes, args.shapes, args.timeout, args.render_frames, repeats=args.repeats)
+    save_results(results, args.output)
+
+    if args.baseline:
+        regressions = compare_results(results, load_results(args.baseline), args.tolerance)
+
+        for record, metric, old, new in regressions:
+            print(f"REGRESSION {record['algorithm']} n={record['size']} {record['shape']}: {metric} {old:.4f} -> {new:.4f}")
+
+        sys.exit(1 if regressions else 0)
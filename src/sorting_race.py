@@ -0,0 +1,151 @@
+import argparse
+import math
+import os
+from bisect import bisect_right
+
+import matplotlib
+
+# Using 'TkAgg' backend to open a separate window, unless MPLBACKEND selects another (e.g. Agg on headless machines)
+if 'MPLBACKEND' not in os.environ:
+    matplotlib.use('TkAgg')
+import matplotlib.animation as animation
+import matplotlib.pyplot as plt
+
+from bar_renderer import create_renderer
+from input_generators import PRODUCERS, generate
+from sorting_algorithms import SortingAlgorithms
+from sorting_trace import TraceReplayer
+from trace_cache import TraceCache
+
+
+class SortingRaceVisualizer:
+    """Race several algorithms on the same input, one subplot each, in a single figure.
+
+    Every algorithm is traced up front. One animation timer then advances all
+    panels by the same number of operations per tick, so algorithms that need
+    fewer operations finish first, and each tick costs one canvas draw (or
+    one blit) for the whole figure instead of one per algorithm.
+    """
+
+    def __init__(self, algorithms, array_size=15, value_range=(1, 100), dark_mode=False, ops_per_tick=None, interval=50, blit=False, shape='uniform', seed=None, cache=True):
+        """Trace every algorithm in `algorithms` on one generated input and start the race.
+
+        `ops_per_tick` defaults to a pace at which the slowest algorithm
+        finishes in about 200 ticks of `interval` milliseconds.
+        """
+        self.algorithms = list(algorithms)
+        self.dark_mode = dark_mode
+        self.interval = interval
+        self.blit = blit
+        self.unordered_list = generate(shape, array_size, value_range, seed=seed).tolist()
+        self.trace_cache = TraceCache() if cache else None
+        self.replayers = [self.build_replayer(algorithm) for algorithm in self.algorithms]
+
+        longest = max(len(replayer.trace.codes) for replayer in self.replayers)
+        self.ops_per_tick = ops_per_tick or max(1, math.ceil(longest / 200))
+        self.positions = [-1] * len(self.replayers)  # Frame currently shown in each panel
+
+        self.fig, self.renderers, self.counters = self.initial_plot(self.unordered_list)
+
+        for counter, replayer in zip(self.counters, self.replayers):
+            if len(replayer) == 0:
+                counter.set_text(f"{len(replayer.trace.codes):,} ops, done")  # Nothing to move, e.g. sorted input
+        self.ani = None
+        self.create_animation()
+
+    def build_replayer(self, algorithm):
+        """Trace `algorithm` on a copy of the shared input."""
+        if not hasattr(SortingAlgorithms, algorithm):
+            raise ValueError(f"Sorting algorithm '{algorithm}' is not defined.")
+
+        if self.trace_cache is not None:
+            return self.trace_cache.replayer(algorithm, self.unordered_list)
+
+        return TraceReplayer(SortingAlgorithms().trace(algorithm, list(self.unordered_list)))
+
+    def initial_plot(self, arr):
+        """Lay out one panel per algorithm, each with its bars and an operation counter."""
+        if self.dark_mode:
+            plt.style.use("dark_background")
+
+        columns = math.ceil(math.sqrt(len(self.algorithms)))
+        rows = math.ceil(len(self.algorithms) / columns)
+        fig, axes = plt.subplots(rows, columns, squeeze=False, figsize=(4 * columns, 3 * rows))
+        renderers, counters = [], []
+        current_color = "white" if self.dark_mode else "yellow"
+
+        for ax in axes.flat[len(self.algorithms):]:
+            ax.set_visible(False)
+
+        for ax, algorithm in zip(axes.flat, self.algorithms):
+            ax.set_title(algorithm, loc='left')
+            ax.set_xlim(-0.5, len(arr) - 0.5)  # Centering the bars
+            ax.set_ylim(0, max(arr) + 10)
+            ax.set_xticks([])
+
+            renderers.append(create_renderer(ax, arr, color="cyan", current_color=current_color, min_color="green"))
+            counters.append(ax.text(0.98, 0.95, "0 ops", transform=ax.transAxes, ha='right', va='top'))
+
+        fig.tight_layout()
+
+        return fig, renderers, counters
+
+    def update_plot(self, tick):
+        """Advance every panel to the last frame within this tick's operation budget."""
+        budget = (tick + 1) * self.ops_per_tick
+
+        for k, replayer in enumerate(self.replayers):
+            frame_ends = replayer.trace.frame_ends
+            frame = bisect_right(frame_ends, budget) - 1
+
+            if frame == self.positions[k]:
+                continue  # Finished, or its next frame needs more operations
+
+            arr_data, current_index, min_index = replayer[frame]
+            self.renderers[k].update(arr_data, current_index, min_index, replayer.dirty)
+            self.positions[k] = frame
+
+            if frame == len(replayer) - 1:
+                self.renderers[k].update(arr_data, -1, -1, ())  # Clearing the highlights of a finished panel
+                self.counters[k].set_text(f"{len(replayer.trace.codes):,} ops, done")  # Including any after the last frame
+            else:
+                self.counters[k].set_text(f"{frame_ends[frame]:,} ops")
+
+        return [renderer.collection for renderer in self.renderers] + self.counters
+
+    def ticks(self):
+        """Yield tick numbers until every panel has shown its last frame."""
+        tick = 0
+
+        while any(position < len(replayer) - 1 for position, replayer in zip(self.positions, self.replayers)):
+            yield tick
+            tick += 1
+
+    def create_animation(self):
+        """Drive all panels from one FuncAnimation, hence one timer and one draw per tick."""
+        self.ani = animation.FuncAnimation(
+            self.fig,
+            self.update_plot,
+            frames=self.ticks,
+            interval=self.interval,
+            repeat=False,
+            blit=self.blit,
+            cache_frame_data=False
+        )
+
+        plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Race several sorting algorithms on the same input.")
+    parser.add_argument("algorithms", nargs="+", help="SortingAlgorithms method names, e.g. bubble_sort tim_sort")
+    parser.add_argument("--size", type=int, default=30, help="Number of elements to sort")
+    parser.add_argument("--shape", default="uniform", choices=PRODUCERS, help="Shape of the generated input")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible input")
+    parser.add_argument("--interval", type=int, default=50, help="Milliseconds between ticks")
+    parser.add_argument("--ops-per-tick", type=int, default=None, help="Operations every algorithm performs per tick")
+    parser.add_argument("--blit", action="store_true", help="Redraw only the bars and counters each tick")
+    parser.add_argument("--dark", action="store_true", help="Use the dark mode colors")
+    args = parser.parse_args()
+
+    SortingRaceVisualizer(args.algorithms, array_size=args.size, dark_mode=args.dark, ops_per_tick=args.ops_per_tick, interval=args.interval, blit=args.blit, shape=args.shape, seed=args.seed)
@@ -0,0 +1,380 @@
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+
+
+# Operation codes stored in the columnar operation log
+COMPARE = 0
+SWAP = 1
+WRITE = 2
+
+# Trace files: this header, then the initial array, the `first`, `second`
+# and frame columns, the keyframes (all native int64), the int8 op codes and
+# the events as JSON last, so every int64 section stays 8-byte aligned for
+# memory mapping
+TRACE_MAGIC = b"SRTTRAC2"
+TRACE_HEADER = struct.Struct("<8s?7xqqqqqq")  # magic, record_compares, n, ops, frames, keyframe interval, keyframes, event bytes
+
+
+def copy_array(arr):
+    """Return a compact copy of a list, `array.array`, NumPy array or memoryview."""
+    if isinstance(arr, memoryview):
+        return np.array(arr)  # Typed copy of the viewed buffer
+    if isinstance(arr, array):
+        return arr[:]  # Slicing an array.array copies it
+
+    return arr.copy()
+
+
+class Recorder:
+    """Hooks the sorting algorithms call for every operation; all of them are no-ops here."""
+
+    def compare(self, i, j):
+        """Positions i and j were compared."""
+
+    def swap(self, i, j):
+        """Positions i and j were swapped."""
+
+    def write(self, i, value):
+        """`value` was stored at position i."""
+
+    def allocate(self, size):
+        """An auxiliary buffer of `size` elements was allocated."""
+
+    def enter(self):
+        """A recursive call started."""
+
+    def leave(self):
+        """A recursive call finished."""
+
+    def event(self, kind, *indices):
+        """An algorithm-level decision (e.g. a run found or a merge started) happened."""
+
+    def frame(self, arr, current_index, min_index):
+        """Return the value the algorithm yields for this frame."""
+
+
+class SnapshotRecorder(Recorder):
+    """Default recorder that yields a full copy of the array for every frame."""
+
+    def frame(self, arr, current_index, min_index):
+        """Return the frame tuple consumed by the visualizers."""
+
+        return copy_array(arr), current_index, min_index
+
+
+class ViewRecorder(Recorder):
+    """Recorder that yields the live array itself, with no copy at all.
+
+    Each frame is only valid until the algorithm is resumed, which suits
+    consumers that render every frame as soon as it is produced.
+    """
+
+    def frame(self, arr, current_index, min_index):
+        """Return the array being sorted without copying it."""
+
+        return arr, current_index, min_index
+
+
+class MetricsRecorder(Recorder):
+    """Recorder that only counts work, for profiling at sizes the visualizer cannot handle."""
+
+    def __init__(self):
+        """Initialize all counters at zero."""
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.allocated = 0  # Total auxiliary elements allocated
+        self.depth = 0
+        self.max_depth = 0
+        self.frames = 0
+        self.events = {}  # Occurrences of each algorithm-level event kind
+
+    def compare(self, i, j):
+        self.comparisons += 1
+
+    def swap(self, i, j):
+        self.swaps += 1
+
+    def write(self, i, value):
+        self.writes += 1
+
+    def allocate(self, size):
+        self.allocated += size
+
+    def enter(self):
+        self.depth += 1
+
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def leave(self):
+        self.depth -= 1
+
+    def event(self, kind, *indices):
+        self.events[kind] = self.events.get(kind, 0) + 1
+
+    def frame(self, arr, current_index, min_index):
+        self.frames += 1
+
+    def as_dict(self):
+        """Return the counters as a plain dictionary."""
+
+        return {
+            'comparisons': self.comparisons,
+            'swaps': self.swaps,
+            'writes': self.writes,
+            'allocated': self.allocated,
+            'max_depth': self.max_depth,
+            'frames': self.frames,
+            'events': dict(self.events),
+        }
+
+
+class OperationTrace(Recorder):
+    """Recorder that stores compact operation events instead of array copies.
+
+    The trace keeps the initial array plus a columnar log of operations
+    (`codes`, `first`, `second`) and, for every frame, the number of
+    operations applied so far and its highlighted indices. Memory therefore
+    grows with the number of operations, not with operations x n.
+    Algorithm-level events are kept too, each with the number of the frame
+    it precedes.
+    """
+
+    def __init__(self, arr, record_compares=True):
+        """Initialize an empty trace for the given integer input array."""
+        self.initial = array('q', arr)
+        self.record_compares = record_compares
+        self.codes = array('b')
+        self.first = array('q')
+        self.second = array('q')
+        self.frame_ends = array('q')  # Number of operations applied at each frame
+        self.frame_current = array('q')
+        self.frame_min = array('q')
+        self.event_frames = array('q')  # Frame each event precedes, in order
+        self.events = []  # (kind, indices) of every event
+
+    def __len__(self):
+        return len(self.frame_ends)
+
+    def compare(self, i, j):
+        """Record a comparison between positions i and j."""
+        if self.record_compares:
+            self.codes.append(COMPARE)
+            self.first.append(i)
+            self.second.append(j)
+
+    def swap(self, i, j):
+        """Record a swap of positions i and j."""
+        self.codes.append(SWAP)
+        self.first.append(i)
+        self.second.append(j)
+
+    def write(self, i, value):
+        """Record that `value` was stored at position i."""
+        self.codes.append(WRITE)
+        self.first.append(i)
+        self.second.append(value)
+
+    def event(self, kind, *indices):
+        """Record an algorithm-level event before the next frame."""
+        self.event_frames.append(len(self.frame_ends))
+        self.events.append((kind, tuple(int(i) for i in indices)))
+
+    def events_until(self, frame):
+        """Return how many events happened up to and including `frame`."""
+
+        return bisect_right(self.event_frames, frame)
+
+    def frame(self, arr, current_index, min_index):
+        """Mark a frame boundary after the operations recorded so far."""
+        self.frame_ends.append(len(self.codes))
+        self.frame_current.append(current_index)
+        self.frame_min.append(min_index)
+
+        return len(self.frame_ends) - 1, current_index, min_index
+
+    def apply(self, arr, start, stop):
+        """Apply operations [start, stop) of the log to `arr` in place."""
+        codes, first, second = self.codes, self.first, self.second
+
+        for k in range(start, stop):
+            code = codes[k]
+
+            if code == SWAP:
+                i, j = first[k], second[k]
+                arr[i], arr[j] = arr[j], arr[i]
+            elif code == WRITE:
+                arr[first[k]] = second[k]
+
+    def touched(self, start, stop):
+        """Return the positions whose value operations [start, stop) may change."""
+        codes, first, second = self.codes, self.first, self.second
+        indices = set()
+
+        for k in range(start, stop):
+            code = codes[k]
+
+            if code == SWAP:
+                indices.add(first[k])
+                indices.add(second[k])
+            elif code == WRITE:
+                indices.add(first[k])
+
+        return indices
+
+    def final_state(self):
+        """Return the array after every recorded operation."""
+        arr = self.initial[:]
+        self.apply(arr, 0, len(self.codes))
+
+        return arr
+
+
+class TraceReplayer:
+    """Rebuild any frame of an `OperationTrace` from periodic keyframes.
+
+    A full copy of the array is kept every `keyframe_interval` operations, so
+    seeking to an arbitrary frame restores the nearest earlier keyframe and
+    replays at most `keyframe_interval` operations instead of the whole log.
+    """
+
+    def __init__(self, trace, keyframe_interval=None, keyframes=None):
+        """Index the trace, defaulting to keyframes about every 4n operations.
+
+        Keyframes built earlier for the same interval (e.g. stored in a
+        trace file) can be passed in to skip the indexing replay.
+        """
+        self.trace = trace
+        self.keyframe_interval = keyframe_interval or max(256, 4 * len(trace.initial))
+        self.keyframes = keyframes if keyframes is not None else self.build_keyframes()
+        self.state = trace.initial[:]
+        self.position = 0  # Number of operations applied to `self.state`
+        self.dirty = None  # Positions changed by the last seek, None if unknown
+
+    def __len__(self):
+        return len(self.trace)
+
+    def build_keyframes(self):
+        """Replay the log once, keeping the state at every multiple of the interval."""
+        interval = self.keyframe_interval
+        state = self.trace.initial[:]
+        keyframes = [state[:]]
+
+        for start in range(0, len(self.trace.codes) - interval + 1, interval):
+            self.trace.apply(state, start, start + interval)
+            keyframes.append(state[:])
+
+        return keyframes
+
+    def seek(self, frame):
+        """Move the replay state to the given frame and return the array."""
+        target = self.trace.frame_ends[frame]
+
+        if 0 <= target - self.position <= self.keyframe_interval:
+            self.dirty = self.trace.touched(self.position, target)
+        else:
+            # Jumping back or far ahead restarts from the nearest keyframe
+            keyframe = target // self.keyframe_interval
+            memoryview(self.state)[:] = self.keyframes[keyframe]  # Keyframes may be arrays or mapped file sections
+            self.position = keyframe * self.keyframe_interval
+            self.dirty = None
+
+        self.trace.apply(self.state, self.position, target)
+        self.position = target
+
+        return self.state
+
+    def segment(self, start, stop):
+        """Return a standalone `OperationTrace` covering frames [start, stop).
+
+        Its initial array is the state right before frame `start`, so the
+        segment can be replayed or rendered independently of the rest.
+        """
+        frame_ends = self.trace.frame_ends
+        op_start = frame_ends[start - 1] if start > 0 else 0
+        initial = self.seek(start - 1) if start > 0 else self.trace.initial
+
+        segment = OperationTrace(initial, record_compares=self.trace.record_compares)
+        segment.codes = self.trace.codes[op_start:frame_ends[stop - 1]]
+        segment.first = self.trace.first[op_start:frame_ends[stop - 1]]
+        segment.second = self.trace.second[op_start:frame_ends[stop - 1]]
+        segment.frame_ends = array('q', (end - op_start for end in frame_ends[start:stop]))
+        segment.frame_current = self.trace.frame_current[start:stop]
+        segment.frame_min = self.trace.frame_min[start:stop]
+        first, last = self.trace.events_until(start - 1), self.trace.events_until(stop - 1)
+        segment.event_frames = array('q', (frame - start for frame in self.trace.event_frames[first:last]))
+        segment.events = self.trace.events[first:last]
+
+        return segment
+
+    def __getitem__(self, frame):
+        """Return `(arr_data, current_index, min_index)` like a snapshot list.
+
+        The returned array is the replayer's working state, so it is only
+        valid until the next lookup.
+        """
+        if frame < 0:
+            frame += len(self)
+
+        if not 0 <= frame < len(self):
+            raise IndexError("trace frame out of range")
+
+        arr_data = self.seek(frame)
+
+        return arr_data, self.trace.frame_current[frame], self.trace.frame_min[frame]
+
+    def save(self, path):
+        """Write the trace and its keyframes to `path` in the binary trace format."""
+        trace = self.trace
+        events = json.dumps([[frame, kind, indices] for frame, (kind, indices) in zip(trace.event_frames, trace.events)]).encode()
+        header = TRACE_HEADER.pack(
+            TRACE_MAGIC, trace.record_compares, len(trace.initial), len(trace.codes),
+            len(trace.frame_ends), self.keyframe_interval, len(self.keyframes), len(events)
+        )
+
+        with open(path, "wb") as f:
+            f.write(header)
+
+            for column in (trace.initial, trace.first, trace.second, trace.frame_ends, trace.frame_current, trace.frame_min, *self.keyframes, trace.codes, events):
+                f.write(column)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a file written by `save` and return a replayer over it.
+
+        The operation log, frame columns and keyframes stay in the mapping,
+        read-only, so opening a trace costs no replay and no copy beyond the
+        initial array and the events.
+        """
+        with open(path, "rb") as f:
+            view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+        magic, record_compares, n, ops, frames, interval, keyframe_count, event_bytes = TRACE_HEADER.unpack_from(view)
+
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"'{path}' is not a sorting trace file.")
+
+        offset = TRACE_HEADER.size
+        sections = []
+
+        for count, typecode in [(n, "q"), (ops, "q"), (ops, "q"), (frames, "q"), (frames, "q"), (frames, "q")] + [(n, "q")] * keyframe_count + [(ops, "b")]:
+            size = count * array(typecode).itemsize
+            sections.append(view[offset:offset + size].cast(typecode))
+            offset += size
+
+        trace = OperationTrace((), record_compares=record_compares)
+        trace.initial.frombytes(sections[0].cast("B"))  # Copied, since replay mutates a copy of it anyway
+        trace.first, trace.second, trace.frame_ends, trace.frame_current, trace.frame_min = sections[1:6]
+        trace.codes = sections[-1]
+
+        for frame, kind, indices in json.loads(bytes(view[offset:offset + event_bytes])):
+            trace.event_frames.append(frame)
+            trace.events.append((kind, tuple(indices)))
+
+        return cls(trace, interval, sections[6:-1])
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import tempfile
+from array import array
+
+import sorting_algorithms
+import sorting_trace
+from sorting_algorithms import SortingAlgorithms
+from sorting_trace import TraceReplayer
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SORTING_TRACE_CACHE",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "sorting-algorithm-visualizer"),
+)
+
+
+def code_version():
+    """Hash of the algorithm and trace sources, so edits to either invalidate cached traces."""
+    digest = hashlib.sha256()
+
+    for module in (sorting_algorithms, sorting_trace):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()[:16]
+
+
+class TraceCache:
+    """Directory of saved traces keyed by algorithm, input and code version.
+
+    Files are named by a hash of that key, so an algorithm/input pair seen
+    before is memory-mapped instead of sorted again. Every hit refreshes the
+    file's modification time, and once the directory grows past `max_bytes`
+    the least recently used traces are deleted.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=256 * 2 ** 20):
+        """Use (and create if needed) `directory`, holding at most `max_bytes` of traces."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = code_version()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, algorithm, arr, record_compares=True):
+        """Return the content hash naming the trace of `algorithm` on `arr`."""
+        digest = hashlib.sha256(f"{algorithm}:{record_compares}:{self.version}:".encode())
+        digest.update(array("q", arr).tobytes())
+
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.trace")
+
+    def get(self, algorithm, arr, record_compares=True):
+        """Return a replayer over the cached trace, or None on a miss."""
+        path = self.path(self.key(algorithm, arr, record_compares))
+
+        try:
+            replayer = TraceReplayer.load(path)
+        except (FileNotFoundError, ValueError):  # Missing, or not a trace file
+            return None
+
+        os.utime(path)  # Marking it as recently used
+
+        return replayer
+
+    def put(self, algorithm, arr, replayer):
+        """Store the replayer's trace for `algorithm` on the (unsorted) input `arr`."""
+        path = self.path(self.key(algorithm, arr, replayer.trace.record_compares))
+        # Writing to a temporary name first, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+
+        try:
+            replayer.save(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.evict()
+
+        return path
+
+    def replayer(self, algorithm, arr, record_compares=True):
+        """Return a replayer for `algorithm` on `arr`, tracing and caching it on a miss.
+
+        `arr` itself is never sorted.
+        """
+        replayer = self.get(algorithm, arr, record_compares)
+
+        if replayer is None:
+            replayer = TraceReplayer(SortingAlgorithms().trace(algorithm, list(arr), record_compares))
+            self.put(algorithm, arr, replayer)
+
+        return replayer
+
+    def evict(self):
+        """Delete the least recently used traces until the cache fits in `max_bytes`."""
+        entries = []
+
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".trace"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            os.remove(path)
+            total -= size